@@ -0,0 +1,248 @@
+"""
+Headless benchmark of the kiosk pipeline
+
+Runs capture, preprocessing, upload and the image work of the UI screens against a
+fake camera and the local stand-in backend, so the numbers are reproducible on any
+Linux box and can be compared across firmware versions.
+
+Features:
+- Fake camera serving a synthetic fundus frame, stand-in backend with fixed latency
+- Captured photo preview and results tile decode/resize (in-memory and from disk)
+- Simulation thumbnails, cold and cached
+- imagesToSend payload build for a live session and one loaded back from disk
+- DemoClient label lookup and a full simulation request
+- Full session latency: capture both eyes, archive, upload, parse, results tiles
+- Peak RSS of the process
+- Machine-readable JSON: python benchmark.py --iterations 20 --output bench.json
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from metrics import Metrics, set_metrics
+
+# Synthetic capture: a dim red fundus disc on black, at the sensor resolution
+FUNDUS_COLOUR = (170, 70, 35)
+# Rows in the synthetic labels CSV of the DemoClient benchmark
+LABEL_ROWS = 5000
+
+def fundus_frame(size):
+    """An RGB array of size with a fundus-like disc, so the fundus crop has something to find."""
+    import numpy as np
+
+    width, height = size
+    y, x = np.ogrid[:height, :width]
+    radius = min(width, height) * 0.4
+    disc = (x - width / 2) ** 2 + (y - height / 2) ** 2 <= radius ** 2
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 12, (height, width, 3), dtype=np.uint8)
+    frame[disc] += np.array(FUNDUS_COLOUR, dtype=np.uint8)
+    return frame
+
+def firmware_version():
+    """git describe of the checkout, None outside a git repository."""
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB (ru_maxrss is KiB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+class Benchmark:
+    """
+    The benchmark run.
+
+    Args:
+        directory: Scratch directory for sessions, thumbnails and the labels CSV.
+        iterations: Repetitions of every measurement.
+        latency: Seconds per request of the stand-in backend.
+    """
+    def __init__(self, directory, iterations=10, latency=0.05):
+        self.directory = directory
+        self.iterations = iterations
+        self.latency = latency
+        # Fresh in-memory metrics, the instrumented camera and client stages are recorded here as well
+        self.metrics = Metrics(path=None)
+        set_metrics(self.metrics)
+
+    def run(self):
+        from network.backendClient import BackendClient
+        from network.mockServer import MockBackend, serve_in_background
+        from vision.camera_impl import CameraSession, FakeBackend, CAPTURE_SIZE
+
+        rss_start = peak_rss_kb()
+        frame = fundus_frame(CAPTURE_SIZE)
+        server, url = serve_in_background(MockBackend(latency=self.latency, per_image_latency=0, seed=0))
+        self.client = BackendClient(base_url=url, max_retries=0)
+        self.camera = CameraSession(FakeBackend(lambda: frame), os.path.join(self.directory, "captures"))
+        self.camera.open()
+        try:
+            self.bench_session()
+            self.bench_screens()
+            self.bench_payload()
+            self.bench_demo()
+        finally:
+            self.camera.close()
+            self.client.close()
+            server.shutdown()
+            server.server_close()
+
+        return {
+            "firmware_version": firmware_version(),
+            "time": time.time(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "iterations": self.iterations,
+            "backend_latency_s": self.latency,
+            "peak_rss_kb": peak_rss_kb(),
+            "baseline_rss_kb": rss_start,
+            "stages": self.metrics.summary(),
+        }
+
+    def new_session(self):
+        from vision.scan_session import ScanSession
+        return ScanSession(self.camera.output_dir)
+
+    def bench_session(self):
+        """Full patient flow without Tk: both eyes captured and archived, uploaded, results tiles built."""
+        from interface.screens import CapturedPhotoScreen, ResultsScreen
+        from interface.touchscreen_ui import result_image
+        from network.exampleClient import imagesToSend
+
+        tile_size = (ResultsScreen.image_width, ResultsScreen.image_height)
+        for _ in range(self.iterations):
+            with self.metrics.timer("session.total"):
+                session = self.new_session()
+                for side in ("left", "right"):
+                    with self.metrics.timer("session.capture"):
+                        captured = self.camera.capture_frame(side, session.stats)
+                    with self.metrics.timer("session.archive"):
+                        session.add(captured, side)
+                    with self.metrics.timer("session.preview"):
+                        captured.preview(CapturedPhotoScreen.photo_size)
+                with self.metrics.timer("session.payload"):
+                    images = imagesToSend(session)
+                with images:
+                    response = self.client.evaluate(images, session_id=session.session_id)
+                with self.metrics.timer("session.parse"):
+                    result = response.json()
+                with self.metrics.timer("session.results_tiles"):
+                    for info in result["image_Info"][:ResultsScreen.tile_count]:
+                        result_image(session, info["name"], tile_size)
+            self.last_session = session
+
+    def bench_screens(self):
+        """Decode/resize work of the captured photo, results and simulation results screens."""
+        from interface.screens import CapturedPhotoScreen, ResultsScreen
+        from interface.thumbnail_cache import ThumbnailCache
+        from interface.touchscreen_ui import result_image
+        from vision.frame_buffer import Frame
+        from vision.scan_session import ScanSession
+
+        tile_size = (ResultsScreen.image_width, ResultsScreen.image_height)
+        session = self.last_session
+        for _ in range(self.iterations):
+            for stored in session.frames():
+                # A new Frame over the same pixels, so the cached preview doesn't hide the resize
+                fresh = Frame(stored.array, stored.name)
+                with self.metrics.timer("screen.captured_photo.preview"):
+                    fresh.preview(CapturedPhotoScreen.photo_size)
+
+            # Results of a session loaded back from disk (e.g. after a restart) decode the JPEGs
+            loaded = ScanSession.load(session.directory)
+            for name in loaded.images:
+                with self.metrics.timer("screen.results.from_disk"):
+                    result_image(loaded, name, tile_size)
+
+        # Simulation results screen: thumbnails of full size captures, cold and cached
+        sources = []
+        for index in range(2):
+            path = os.path.join(self.directory, f"sample{index}.jpg")
+            session.get("1_left.jpg").image().save(path, "JPEG", quality=95)
+            sources.append(path)
+        for iteration in range(self.iterations):
+            cache = ThumbnailCache(cache_dir=os.path.join(self.directory, f"thumbnails{iteration}"))
+            for path in sources:
+                with self.metrics.timer("screen.results_sim.thumbnail_cold"):
+                    cache.get(path, tile_size)
+                with self.metrics.timer("screen.results_sim.thumbnail_cached"):
+                    cache.get(path, tile_size)
+
+    def bench_payload(self):
+        """imagesToSend: encoding a live session from memory vs re-encoding its archived JPEGs."""
+        from network.exampleClient import imagesToSend
+        from vision.frame_buffer import Frame
+        from vision.scan_session import ScanSession
+
+        session = self.last_session
+        for _ in range(self.iterations):
+            live = self.new_session()
+            for stored in session.frames():
+                live.put(Frame(stored.array, stored.name))  # fresh frames, no cached JPEG
+            with self.metrics.timer("payload.live_session"):
+                imagesToSend(live).close()
+            with self.metrics.timer("payload.from_disk"):
+                imagesToSend(ScanSession.load(session.directory)).close()
+
+    def bench_demo(self):
+        """DemoClient label lookup (cold and cached CSV) and a full simulation request."""
+        from vision.demo_diagnoses import DemoClient
+
+        images_dir = os.path.join(self.directory, "demo_images")
+        os.makedirs(images_dir, exist_ok=True)
+        filenames = ["0004.jpg", "0024.jpg"]
+        for filename in filenames:
+            self.last_session.get("1_left.jpg").image().save(os.path.join(images_dir, filename), "JPEG")
+        csv_path = os.path.join(self.directory, "labels.csv")
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["fundus", "types"])
+            for index in range(LABEL_ROWS):
+                writer.writerow([f"{index:04d}.jpg", index % 2])
+
+        demo = DemoClient(images_dir=images_dir, csv_dir=csv_path, client=self.client)
+        diagnosis = {"image_Info": [{"name": name, "prediction": "Normal"} for name in filenames]}
+        for _ in range(self.iterations):
+            demo._labels_mtime = None  # force a re-read of the CSV
+            with self.metrics.timer("demo.labels_cold"):
+                demo._compare_with_labels(filenames, diagnosis)
+            with self.metrics.timer("demo.labels_cached"):
+                demo._compare_with_labels(filenames, diagnosis)
+            with self.metrics.timer("demo.request"):
+                demo.send_images_and_get_diagnosis(filenames)
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark of capture, upload and UI image work")
+    parser.add_argument("--iterations", type=int, default=10, help="Repetitions of every measurement")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request of the stand-in backend")
+    parser.add_argument("--output", default=None, help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Progress prints of the firmware go to stderr so stdout is only the JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            results = Benchmark(directory, args.iterations, args.latency).run()
+
+    data = json.dumps(results, indent=2)
+    if args.output is None:
+        print(data)
+    else:
+        with open(args.output, "w") as f:
+            f.write(data + "\n")
+        print(f"Benchmark results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
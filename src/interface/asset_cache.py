@@ -0,0 +1,145 @@
+"""
+UI asset cache
+
+Every screen asset is decoded once and handed out as a shared PhotoImage, so
+navigating between screens doesn't re-open and re-decode the PNGs.
+
+Features:
+- Assets keyed by logical name (e.g. "eye_select.left")
+- Background decoding of all assets at boot
+- PhotoImages are created once on the Tk thread and shared between screens
+- Memory report of the decoded assets
+"""
+import queue
+import threading
+from pathlib import Path
+from PIL import Image, ImageTk
+
+# Define the base path to the 'interface_ui' directory
+BASE_PATH = Path(__file__).parent / "interface_ui"
+
+# Logical asset name -> file under interface_ui
+ASSETS = {
+    "start.background": "assets/start/Start Screen Background.png",
+    "start.start_button": "assets/start/Start Scan Button.png",
+    "start.simulation_button": "assets/start/Simulation Button.png",
+    "simulation.background": "assets/simulation screen/simulation background.png",
+    "simulation.next_button": "assets/simulation screen/Next button.png",
+    "simulation.back_button": "assets/simulation screen/Back Button.png",
+    "simulation.refresh_button": "assets/simulation screen/Refresh Button.png",
+    "results.background": "assets/results screen/results background.png",
+    "results.finish_button": "assets/results screen/finish button.png",
+    "eye_select.background": "assets/eye select/Eye Selection screen.png",
+    "eye_select.back_button": "assets/eye select/Back Button.png",
+    "eye_select.submit_button": "assets/eye select/Submit.png",
+    "eye_select.submit_button_disabled": "assets/eye select/Submit.png",
+    "eye_select.left": "assets/eye select/left eye.png",
+    "eye_select.left_disabled": "assets/eye select/left eye disabled.png",
+    "eye_select.right": "assets/eye select/right eye.png",
+    "eye_select.right_disabled": "assets/eye select/right eye disabled.png",
+    "timer.background": "assets/timer screen/Timer Background.png",
+    "picture_taken.background": "assets/picture taken/picture taken.png",
+}
+
+class AssetCache:
+    """
+    Decodes UI assets once and shares the resulting PhotoImages.
+
+    Args:
+        root: The Tk root window (PhotoImages can only be created on the Tk thread).
+        base_path: Directory the asset paths are relative to.
+        assets: Logical name -> relative path mapping.
+    """
+    def __init__(self, root, base_path=BASE_PATH, assets=ASSETS):
+        self.root = root
+        self.base_path = Path(base_path)
+        self.assets = dict(assets)
+        # Keyed by asset path so names that share a file share one decoded copy
+        self._images = {}  # path -> decoded PIL image
+        self._photos = {}  # path -> shared ImageTk.PhotoImage
+        self._lock = threading.Lock()
+        self._decoded = queue.Queue()  # names decoded in the background, waiting for a PhotoImage
+
+    def image(self, name):
+        """
+        Return the decoded PIL image of an asset, decoding it if needed (safe from any thread).
+        """
+        path = self.assets[name]
+        with self._lock:
+            img = self._images.get(path)
+        if img is not None:
+            return img
+
+        # Decoding happens outside the lock, at worst two threads decode the same asset once
+        with Image.open(self.base_path / path) as source:
+            img = source.copy()
+        with self._lock:
+            return self._images.setdefault(path, img)
+
+    def photo(self, name):
+        """
+        Return the shared PhotoImage of an asset (Tk thread only).
+        """
+        path = self.assets[name]
+        photo = self._photos.get(path)
+        if photo is None:
+            photo = ImageTk.PhotoImage(self.image(name))
+            self._photos[path] = photo
+        return photo
+
+    def preload(self, background=True):
+        """
+        Decode every asset, in a background thread by default. PhotoImages for the
+        decoded assets are then created one per Tk idle tick so the UI stays responsive.
+        """
+        def decode_all():
+            for name in self.assets:
+                try:
+                    self.image(name)
+                    self._decoded.put(name)
+                except OSError as e:
+                    print(f"Failed to load UI asset {name}: {e}")
+            self._decoded.put(None)  # all assets decoded
+
+        if background:
+            threading.Thread(target=decode_all, name="asset-preload", daemon=True).start()
+            self.root.after(20, self._create_pending_photos)
+        else:
+            decode_all()
+            while self._decoded.get() is not None:
+                pass
+            for name in self.assets:
+                if self.assets[name] in self._images:
+                    self.photo(name)
+
+    def _create_pending_photos(self):
+        """Convert one decoded asset to a PhotoImage per tick until all assets are done."""
+        try:
+            name = self._decoded.get_nowait()
+        except queue.Empty:
+            self.root.after(20, self._create_pending_photos)  # decoder still running
+            return
+        if name is None:
+            self.memory_report()
+            return
+        self.photo(name)
+        self.root.after(1, self._create_pending_photos)
+
+    def memory_report(self):
+        """
+        Print and return the memory held by the cached assets.
+
+        Returns:
+            dict: asset path -> bytes of the decoded image, plus a 'total' entry. PhotoImages hold
+                  roughly another 4 bytes per pixel on the Tk side.
+        """
+        report = {}
+        with self._lock:
+            images = dict(self._images)
+        for path, img in images.items():
+            report[path] = img.width * img.height * len(img.getbands())
+        report["total"] = sum(report.values())
+        photo_bytes = sum(photo.width() * photo.height() * 4 for photo in self._photos.values())
+        print(f"UI assets: {len(images)} decoded, {report['total'] / 1e6:.1f} MB PIL, "
+              f"{len(self._photos)} PhotoImages, ~{photo_bytes / 1e6:.1f} MB Tk")
+        return report
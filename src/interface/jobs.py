@@ -0,0 +1,137 @@
+"""
+Background jobs for the touchscreen UI
+
+Tkinter is single threaded, so anything slow (camera capture, image encoding,
+server requests) runs on a worker thread here and reports back to the UI thread
+through a queue that is polled with root.after().
+
+Features:
+- Thread pool for capture, encode and upload work
+- Progress callbacks delivered on the Tk thread
+- Cooperative cancellation (results of a cancelled job are dropped)
+- A UI callback that raises is logged, polling carries on for the other jobs
+"""
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+class Job:
+    """
+    Handle for a job running on the JobRunner. The worker function receives the
+    job as its first argument so it can report progress and check for cancellation.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.future = None
+        self._cancel_event = threading.Event()
+        self._runner = None
+
+    def cancel(self):
+        """Request cancellation, the job's done/error callbacks will not be called."""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def report_progress(self, message):
+        """Send a progress update to the UI thread (safe to call from the worker)."""
+        if self._runner is not None and not self.cancelled:
+            self._runner._events.put((self, "progress", message))
+
+class JobRunner:
+    """
+    Runs functions on a thread pool and delivers their callbacks on the Tk main thread.
+
+    Args:
+        root: The Tk root window used to schedule queue polling.
+        max_workers: Number of worker threads.
+        poll_interval: Milliseconds between checks of the callback queue.
+    """
+    def __init__(self, root, max_workers=2, poll_interval=50):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ui-job")
+        self._events = queue.Queue()
+        self._callbacks = {}
+        self._poll_id = None
+        self._stopped = False
+        self._poll()
+
+    def submit(self, name, fn, *args, on_done=None, on_error=None, on_progress=None, **kwargs):
+        """
+        Run fn(job, *args, **kwargs) on a worker thread.
+
+        Args:
+            name: Name of the job (for logging).
+            fn: Function to run off the UI thread. Must not touch Tk widgets.
+            on_done: Called on the UI thread with the function's return value.
+            on_error: Called on the UI thread with the raised exception.
+            on_progress: Called on the UI thread with each job.report_progress() message.
+
+        Returns:
+            Job: Handle that can be used to cancel the job.
+        """
+        job = Job(name)
+        job._runner = self
+        self._callbacks[job] = (on_done, on_error, on_progress)
+
+        def run():
+            try:
+                result = fn(job, *args, **kwargs)
+            except Exception as e:
+                self._events.put((job, "error", e))
+            else:
+                self._events.put((job, "done", result))
+
+        job.future = self._executor.submit(run)
+        return job
+
+    def _poll(self):
+        """Drain the event queue and dispatch callbacks on the Tk thread."""
+        try:
+            while True:
+                try:
+                    job, kind, value = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                self._dispatch(job, kind, value)
+        finally:
+            # Keep polling even if something above failed, otherwise every later job result is lost
+            if not self._stopped:
+                self._poll_id = self.root.after(self.poll_interval, self._poll)
+
+    def _dispatch(self, job, kind, value):
+        on_done, on_error, on_progress = self._callbacks.get(job, (None, None, None))
+        if kind != "progress":
+            self._callbacks.pop(job, None)
+        if job.cancelled:
+            if kind != "progress":
+                print(f"Job '{job.name}' was cancelled, dropping its {kind} result")
+            return
+
+        # A failing UI callback is logged, it must not stop the callbacks of other jobs
+        try:
+            if kind == "progress" and on_progress is not None:
+                on_progress(value)
+            elif kind == "done" and on_done is not None:
+                on_done(value)
+            elif kind == "error":
+                if on_error is not None:
+                    on_error(value)
+                else:
+                    print(f"Job '{job.name}' failed: {value}")
+        except Exception:
+            print(f"Job '{job.name}' {kind} callback failed:")
+            traceback.print_exc()
+
+    def shutdown(self):
+        """Stop polling and cancel any jobs that haven't started yet."""
+        self._stopped = True
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+        for job in list(self._callbacks):
+            job.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
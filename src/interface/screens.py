@@ -0,0 +1,387 @@
+"""
+Screens of the RetinAI touchscreen interface
+
+Each screen is built once (canvas, images, buttons and bindings) and then shown,
+hidden and updated in place by the ScreenManager, instead of the whole frame
+being destroyed and rebuilt on every navigation.
+
+Features:
+- ScreenManager that constructs screens on first use and switches between them
+- Transition latency measurement for every navigation, also recorded in the kiosk metrics
+- Welcome, eye selection, countdown, captured photo, processing, results and simulation screens
+- Live camera preview on the countdown screen
+"""
+import time
+import tkinter as tk
+from PIL import Image, ImageTk
+
+from metrics import get_metrics
+
+# Raspberry Pi touchscreen resolution
+SCREEN_WIDTH, SCREEN_HEIGHT = 1280, 720
+
+class Screen:
+    """
+    Base class of a screen: a frame holding a full screen canvas with a background image.
+    Subclasses set background to an asset cache name, create their widgets once in build()
+    and change them in update().
+
+    Args:
+        ui: The TouchscreenUI the screen belongs to (navigation callbacks and asset cache).
+    """
+    background = None
+
+    def __init__(self, ui):
+        self.ui = ui
+        self.frame = tk.Frame(ui.root)
+        self.canvas = tk.Canvas(self.frame, width=SCREEN_WIDTH, height=SCREEN_HEIGHT)
+        self.canvas.create_image(0, 0, image=ui.assets.photo(self.background), anchor="nw")
+        self.canvas.pack(fill="both", expand=True)
+        self.build()
+
+    def build(self):
+        """Create the screen's widgets, called once."""
+
+    def update(self, **state):
+        """Update the screen in place before it is shown."""
+
+    def on_hide(self):
+        """Called when another screen is shown, e.g. to stop timers."""
+
+    def create_button(self, x, y, img, event_function=None, *args, **kwargs):
+        button = self.canvas.create_image(x, y, image=img)
+        if event_function is not None:
+            self.canvas.tag_bind(button, "<Button-1>", lambda event: event_function(*args, **kwargs))
+        return button
+
+    def set_button(self, button, img, event_function=None, *args, **kwargs):
+        """Change a canvas button's image and click handler (None disables it)."""
+        self.canvas.itemconfig(button, image=img)
+        self.canvas.tag_unbind(button, "<Button-1>")
+        if event_function is not None:
+            self.canvas.tag_bind(button, "<Button-1>", lambda event: event_function(*args, **kwargs))
+
+class ScreenManager:
+    """
+    Builds each screen once and switches between them by packing/unpacking their frames.
+
+    Args:
+        ui: The TouchscreenUI passed to every screen.
+        screens: Screen name -> Screen subclass.
+    """
+    def __init__(self, ui, screens):
+        self.ui = ui
+        self.screen_classes = dict(screens)
+        self.screens = {}
+        self.current = None
+        self.current_name = None
+        self.transition_times = []  # (screen name, seconds from show() until drawn)
+
+    def get(self, name):
+        """Return a screen, building it the first time it is needed."""
+        screen = self.screens.get(name)
+        if screen is None:
+            screen = self.screen_classes[name](self.ui)
+            self.screens[name] = screen
+        return screen
+
+    def build_all(self):
+        """Build every screen ahead of time so the first visit is as fast as the others."""
+        for name in self.screen_classes:
+            self.get(name)
+
+    def show(self, name, **state):
+        """
+        Update a screen with the given state and show it.
+
+        Returns:
+            Screen: The screen being shown.
+        """
+        start_time = time.perf_counter()
+        screen = self.get(name)
+        screen.update(**state)
+
+        if screen is not self.current:
+            if self.current is not None:
+                self.current.on_hide()
+                self.current.frame.pack_forget()
+            screen.frame.pack(fill="both", expand=True)
+            self.current = screen
+            self.current_name = name
+
+        # Measure until Tk has drawn the change
+        screen.frame.update_idletasks()
+        elapsed = time.perf_counter() - start_time
+        self.transition_times.append((name, elapsed))
+        get_metrics().record(f"ui.screen.{name}", elapsed)
+        return screen
+
+    def transition_report(self):
+        """
+        Summarize the transition latency per screen.
+
+        Returns:
+            dict: screen name -> (count, mean ms, max ms)
+        """
+        report = {}
+        for name in self.screen_classes:
+            times = [elapsed for screen_name, elapsed in self.transition_times if screen_name == name]
+            if times:
+                report[name] = (len(times), 1000 * sum(times) / len(times), 1000 * max(times))
+        return report
+
+class WelcomeScreen(Screen):
+    background = "start.background"
+
+    def build(self):
+        # Set start and simulation button positions and binds
+        self.create_button(640, 360, self.ui.assets.photo("start.start_button"), self.ui.show_eye_selection_screen)
+        self.create_button(1125, 650, self.ui.assets.photo("start.simulation_button"), self.ui.show_simulation_screen)
+
+class EyeSelectionScreen(Screen):
+    background = "eye_select.background"
+
+    def build(self):
+        assets = self.ui.assets
+        self.create_button(80, 75, assets.photo("eye_select.back_button"), self.ui.show_welcome_screen)
+        self.left_button = self.create_button(380, 400, assets.photo("eye_select.left"))
+        self.right_button = self.create_button(900, 400, assets.photo("eye_select.right"))
+        self.submit_button = self.create_button(1200, 650, assets.photo("eye_select.submit_button_disabled"))
+
+    def update(self, left_taken=False, right_taken=False):
+        assets = self.ui.assets
+
+        # Eye buttons are disabled once their photo is captured
+        if not left_taken:
+            self.set_button(self.left_button, assets.photo("eye_select.left"), self.ui.capture_photo_with_countdown, "Left")
+        else:
+            self.set_button(self.left_button, assets.photo("eye_select.left_disabled"))
+
+        if not right_taken:
+            self.set_button(self.right_button, assets.photo("eye_select.right"), self.ui.capture_photo_with_countdown, "Right")
+        else:
+            self.set_button(self.right_button, assets.photo("eye_select.right_disabled"))
+
+        # Submit button, greyed out until both eyes are captured
+        if left_taken and right_taken:
+            self.set_button(self.submit_button, assets.photo("eye_select.submit_button"), self.ui.submit_images_and_show_results)
+        else:
+            self.set_button(self.submit_button, assets.photo("eye_select.submit_button_disabled"))
+
+class CountdownScreen(Screen):
+    background = "timer.background"
+    preview_size = (640, 480)
+    preview_fps = 24
+
+    def build(self):
+        # Live preview, one PhotoImage that the newest camera frame is pasted into
+        self.preview_photo = ImageTk.PhotoImage(Image.new("RGB", self.preview_size))
+        self.preview_id = self.canvas.create_image(560, 360, image=self.preview_photo, state="hidden")
+        self.countdown_text_id = self.canvas.create_text(640, 450, text="5", font=("M Plus 1", 150), fill="white")
+        self.stream = None
+        self._pump_id = None
+        self._next_frame = 0
+
+    def update(self, seconds_left=3):
+        self.canvas.itemconfig(self.countdown_text_id, text=str(seconds_left))
+
+    def start_preview(self, stream):
+        """Show the live preview of a PreviewStream next to the countdown."""
+        self.stream = stream.start()
+        self.canvas.itemconfig(self.preview_id, state="normal")
+        self.canvas.coords(self.countdown_text_id, 1080, 360)
+        self._next_frame = time.monotonic()
+        self._pump()
+
+    def _pump(self):
+        # Only the newest frame is drawn, frames grabbed while the UI was busy are dropped by the stream
+        frame = self.stream.latest()
+        if frame is not None:
+            image = Image.fromarray(frame)
+            if image.size != self.preview_size:
+                image = image.resize(self.preview_size)
+            self.preview_photo.paste(image)
+
+        # Keep a steady frame rate, a late tick schedules the next one sooner instead of drifting
+        interval = 1 / self.preview_fps
+        self._next_frame = max(self._next_frame + interval, time.monotonic())
+        delay = int(1000 * (self._next_frame - time.monotonic()))
+        self._pump_id = self.canvas.after(max(1, delay), self._pump)
+
+    def stop_preview(self):
+        """Stop the live preview without waiting for the grabber thread."""
+        if self._pump_id is not None:
+            self.canvas.after_cancel(self._pump_id)
+            self._pump_id = None
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream = None
+            self.canvas.itemconfig(self.preview_id, state="hidden")
+            self.canvas.coords(self.countdown_text_id, 640, 450)
+
+    def on_hide(self):
+        self.stop_preview()
+
+class CapturedPhotoScreen(Screen):
+    background = "picture_taken.background"
+    photo_size = (500, 400)
+
+    def build(self):
+        # One PhotoImage reused for every capture, new photos are pasted into it
+        self.photo = ImageTk.PhotoImage(Image.new("RGB", self.photo_size))
+        self.canvas.create_image(655, 400, image=self.photo, anchor="center")
+
+    def update(self, image=None):
+        if image is not None:
+            self.photo.paste(image.resize(self.photo_size))
+
+class ProcessingScreen(Screen):
+    background = "timer.background"
+
+    def build(self):
+        # Spinner arc, rotated every frame to show the kiosk hasn't frozen
+        self.spinner_id = self.canvas.create_arc(570, 300, 710, 440, start=0, extent=270, style="arc", outline="white", width=12)
+
+        self.status_label = tk.Label(self.canvas, text="", font=("Helvetica", 24), fg="black", bg="white")
+        self.canvas.create_window(640, 520, window=self.status_label)
+
+        self.cancel_button = tk.Button(self.canvas, text="Cancel", font=("Helvetica", 18))
+        self.cancel_window = self.canvas.create_window(640, 620, window=self.cancel_button)
+        self._spin_id = None
+        self._angle = 0
+
+    def update(self, message="", on_cancel=None):
+        self.set_status(message)
+        if on_cancel is not None:
+            self.cancel_button.config(command=on_cancel)
+            self.canvas.itemconfig(self.cancel_window, state="normal")
+        else:
+            self.canvas.itemconfig(self.cancel_window, state="hidden")
+        if self._spin_id is None:
+            self._spin()
+
+    def set_status(self, message):
+        self.status_label.config(text=message)
+
+    def _spin(self):
+        self.canvas.itemconfig(self.spinner_id, start=self._angle)
+        self._angle = (self._angle - 12) % 360
+        self._spin_id = self.canvas.after(40, self._spin)
+
+    def on_hide(self):
+        if self._spin_id is not None:
+            self.canvas.after_cancel(self._spin_id)
+            self._spin_id = None
+
+class ResultsScreen(Screen):
+    """
+    Two result tiles side by side, each an image with a text label below it.
+    Used for both the live and the simulation results.
+    """
+    background = "results.background"
+
+    # Define positions and dimensions for images and labels
+    image_width, image_height = 350, 350  # Image size
+    padding_x = 120  # Padding between elements
+    start_x, start_y = 405, 400  # Starting position for first image
+    tile_count = 2
+
+    def build(self):
+        self.tiles = []
+        for i in range(self.tile_count):
+            # Calculate position for each image and label
+            x = self.start_x + i * (self.image_width + self.padding_x)
+            y = self.start_y
+
+            # Image label with a PhotoImage that new results are pasted into
+            photo = ImageTk.PhotoImage(Image.new("RGB", (self.image_width, self.image_height), "white"))
+            img_label = tk.Label(self.canvas, image=photo)
+            img_label.image = photo  # Keep a reference to avoid garbage collection
+            image_window = self.canvas.create_window(x, y, window=img_label)
+
+            # Info label below image
+            result_label = tk.Label(self.canvas, text="", font=("Helvetica", 14), bg="white")
+            label_window = self.canvas.create_window(x, y + self.image_height // 2 + 45, window=result_label)
+            self.tiles.append((photo, image_window, result_label, label_window))
+
+        # Create finish button
+        self.create_button(1200, 660, self.ui.assets.photo("results.finish_button"), self.ui.show_welcome_screen)
+
+    def update(self, tiles=()):
+        """
+        Args:
+            tiles: List of (PIL image or None, text, text colour, justify) per tile, at most tile_count.
+        """
+        for i, (_, image_window, _, label_window) in enumerate(self.tiles):
+            if i < len(tiles):
+                self.set_tile(i, *tiles[i])
+            else:
+                self.canvas.itemconfig(image_window, state="hidden")
+                self.canvas.itemconfig(label_window, state="hidden")
+
+    def set_tile(self, i, image, text, fg="black", justify="center"):
+        """Update one tile in place."""
+        photo, image_window, result_label, label_window = self.tiles[i]
+        if image is not None:
+            photo.paste(image)
+        result_label.config(text=text, fg=fg, justify=justify)
+        self.canvas.itemconfig(image_window, state="normal")
+        self.canvas.itemconfig(label_window, state="normal")
+
+class SimulationScreen(Screen):
+    background = "simulation.background"
+
+    # 2x3 Grid placement of random images
+    button_width, button_height = 200, 200  # Button size
+    padding_x, padding_y = 95, 80  # Padding between buttons
+    start_x, start_y = 365, 260  # Starting position
+
+    def build(self):
+        assets = self.ui.assets
+
+        # Create next, back, and refresh buttons
+        self.create_button(1200, 660, assets.photo("simulation.next_button"), self.ui.submit_selected_images)
+        self.create_button(60, 60, assets.photo("simulation.back_button"), self.ui.show_welcome_screen)
+        self.create_button(60, 660, assets.photo("simulation.refresh_button"), self.ui.show_simulation_screen)
+
+        self.tiles = []
+        for i in range(6):
+            # Calculate position for each button in grid
+            row = i // 3
+            col = i % 3
+            x = self.start_x + col * (self.button_width + self.padding_x)
+            y = self.start_y + row * (self.button_height + self.padding_y)
+
+            # Button with a PhotoImage that new thumbnails are pasted into
+            photo = ImageTk.PhotoImage(Image.new("RGB", (self.button_width, self.button_height), "white"))
+            btn = tk.Button(self.canvas, image=photo, relief="flat", bg="white")
+            btn.image = photo  # Keep a reference to avoid garbage collection
+            self.canvas.create_window(x, y, window=btn)
+
+            # Label for the image name below the button
+            label = tk.Label(self.canvas, text="", font=("Helvetica", 12), bg="white")
+            self.canvas.create_window(x, y + self.button_height // 2 + 15, window=label)
+            self.tiles.append((photo, btn, label))
+        self.image_buttons = {}
+
+    def update(self, image_files=(), thumbnails=()):
+        """
+        Args:
+            image_files: The six image paths to show.
+            thumbnails: The matching thumbnail images.
+        """
+        self.image_buttons = {}
+        for (photo, btn, label), image_file, thumbnail in zip(self.tiles, image_files, thumbnails):
+            photo.paste(thumbnail)
+            btn.config(command=lambda f=image_file: self.ui.select_image(f), relief="flat", bg="white")
+            label.config(text=image_file.name if hasattr(image_file, "name") else str(image_file))
+
+            # Store the button in the dictionary for later updates
+            self.image_buttons[image_file] = btn
+
+    def set_selected(self, image_file, selected):
+        """Update a tile's appearance to indicate (de)selection."""
+        if selected:
+            self.image_buttons[image_file].config(relief="sunken", bg="lightgray")
+        else:
+            self.image_buttons[image_file].config(relief="flat", bg="white")
@@ -0,0 +1,156 @@
+"""
+Thumbnail cache for the simulation screens
+
+The simulation grid shows small tiles of full size fundus JPEGs. Thumbnails are
+kept in a persistent on-disk cache so refreshing the grid doesn't decode and
+resize the full images again, and the sample directory listing is cached in memory.
+
+Features:
+- In-memory directory listing, only re-read when the directory changes
+- On-disk thumbnail cache keyed by path, mtime, file size and thumbnail size
+- LRU eviction of the on-disk cache plus a small in-memory LRU
+- JPEG draft-mode decoding for cache misses
+"""
+import hashlib
+import os
+import random
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from PIL import Image
+
+# Default location of the on-disk thumbnail cache
+CACHE_DIR = Path.home() / ".cache" / "retinai" / "thumbnails"
+
+class DirectoryIndex:
+    """
+    In-memory listing of a directory, refreshed only when the directory's mtime changes.
+
+    Args:
+        directory: Directory to list.
+        pattern: Glob pattern of the files to include.
+    """
+    def __init__(self, directory, pattern="*.jpg"):
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self._files = []
+        self._mtime = None
+
+    def files(self):
+        """Return the matching files, re-listing the directory only if it changed."""
+        try:
+            mtime = self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._files, self._mtime = [], None
+            return self._files
+        if mtime != self._mtime:
+            self._files = sorted(self.directory.glob(self.pattern))
+            self._mtime = mtime
+        return self._files
+
+    def sample(self, count):
+        """
+        Randomly select count files.
+
+        Raises:
+            ValueError: If the directory has fewer than count files.
+        """
+        return random.sample(self.files(), count)
+
+class ThumbnailCache:
+    """
+    Persistent thumbnail cache with LRU eviction.
+
+    Args:
+        cache_dir: Directory the thumbnails are stored in.
+        max_entries: Maximum number of thumbnails kept on disk.
+        memory_entries: Number of thumbnails also kept decoded in memory.
+    """
+    def __init__(self, cache_dir=CACHE_DIR, max_entries=5000, memory_entries=64):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> PIL image
+        self._disk_count = None  # number of thumbnails on disk, counted on first write
+        self._lock = threading.Lock()
+
+    def _key(self, image_path, size):
+        """Cache key of a thumbnail, changes whenever the source file is modified."""
+        stat = os.stat(image_path)
+        identity = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}|{size[0]}x{size[1]}"
+        return hashlib.sha1(identity.encode()).hexdigest()
+
+    def get(self, image_path, size):
+        """
+        Return the thumbnail of an image resized to size, from the cache if possible.
+
+        Args:
+            image_path: Path of the full size image.
+            size: (width, height) of the thumbnail.
+
+        Returns:
+            PIL.Image: The thumbnail.
+        """
+        key = self._key(image_path, size)
+
+        with self._lock:
+            img = self._memory.get(key)
+            if img is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return img
+
+        cache_path = self.cache_dir / f"{key}.jpg"
+        try:
+            with Image.open(cache_path) as cached:
+                img = cached.copy()
+            os.utime(cache_path)  # mark as recently used for LRU eviction
+            self.hits += 1
+        except (FileNotFoundError, OSError):
+            img = self._make_thumbnail(image_path, size)
+            self._store(cache_path, img)
+            self.misses += 1
+
+        with self._lock:
+            self._memory[key] = img
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+        return img
+
+    def _make_thumbnail(self, image_path, size):
+        with Image.open(image_path) as img:
+            # Let the JPEG decoder downscale by up to 8x while decoding
+            img.draft("RGB", size)
+            return img.convert("RGB").resize(size, Image.Resampling.LANCZOS)
+
+    def _store(self, cache_path, img):
+        """Write a thumbnail atomically and evict the least recently used ones if over budget."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".tmp")
+            img.save(tmp_path, "JPEG", quality=90)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Failed to write thumbnail cache entry: {e}")
+            return
+
+        with self._lock:
+            if self._disk_count is None:
+                self._disk_count = sum(1 for _ in self.cache_dir.glob("*.jpg"))
+            else:
+                self._disk_count += 1
+            if self._disk_count > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """Delete the least recently used tenth of the cache (caller holds the lock)."""
+        entries = sorted(self.cache_dir.glob("*.jpg"), key=lambda path: path.stat().st_mtime)
+        remove = len(entries) - int(self.max_entries * 0.9)
+        for path in entries[:max(remove, 0)]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        self._disk_count = len(entries) - max(remove, 0)
@@ -13,22 +13,47 @@ Features:
 - Results screen
 - Simulation screen to select simulated retinal captures
 - Simulation results screen to view preliminary diagnosis
+- Processing screen while capture and upload run in the background
+- Captured frames stay in memory for the preview, upload and results screens
+- Every patient gets a scan session with its own ID and directory
+- Sessions are uploaded through a store-and-forward queue, so outages don't lose captures
+- Per-stage timings of every session (capture, upload, server wait, rendering) in the kiosk metrics
+- Results appear per eye as they arrive, the eye still being evaluated shows a placeholder
+- Each eye is uploaded right after its capture, while the next eye is being taken
 """
 from pathlib import Path
-import tkinter as tk
 from tkinter import messagebox
-from vision.demo_diagnoses import DemoClient
-from vision.camera_impl import capture_photo
-from network.exampleClient import backendRequests
-from network.exampleClientVariables import imagesLocation
+from vision.camera_impl import initialize_camera
+from interface.jobs import JobRunner
+from interface.asset_cache import AssetCache
+from interface.thumbnail_cache import DirectoryIndex, ThumbnailCache
+from interface.screens import (ScreenManager, WelcomeScreen, EyeSelectionScreen, CountdownScreen,
+                               CapturedPhotoScreen, ProcessingScreen, ResultsScreen, SimulationScreen)
+from network.exampleClientVariables import imagesLocation, upload_pipelined
+from metrics import get_metrics
 import time
-import random
-import requests
-from PIL import Image, ImageTk
-import os
+import threading
+from PIL import Image
 
-# Define the base path to the 'interface_ui' directory
-BASE_PATH = Path(__file__).parent / "interface_ui"
+# How often the processing screen polls the upload queue for a result
+UPLOAD_POLL_MS = 250
+# Seconds the patient waits on an unreachable server before being told the scan is queued
+OFFLINE_NOTICE_AFTER = 15
+
+# The network client (requests) and DemoClient are imported on first use
+# so they don't delay the welcome screen at boot
+
+def result_image(session, filename, size):
+    """
+    Image of a results tile: the in-memory frame resized to size, falling back to the saved image.
+    """
+    frame = session.get(filename)
+    if frame is not None:
+        return frame.preview(size)
+    with Image.open(session.image_path(filename)) as img:
+        # Let the JPEG decoder downscale while decoding
+        img.draft("RGB", size)
+        return img.convert("RGB").resize(size, Image.Resampling.LANCZOS)
 
 class TouchscreenUI:
     """
@@ -36,20 +61,93 @@ class TouchscreenUI:
     This class is designed to manage and display different screens (or views) to guide the user through the retina scanning process
     while also calling relevant vision and network functions in the background.
     """
-    def __init__(self, root):
+    def __init__(self, root, camera=None):
         self.root = root
+        self.camera = camera  # Warm CameraSession opened in main.py
+        self.jobs = JobRunner(root)  # Runs capture and upload off the Tk thread
+        self.current_job = None
+        self.assets = AssetCache(root)  # Decoded UI assets shared between screens
         self.root.title("RetinAI Touchscreen Interface")
         self.root.geometry("1280x720")  # Raspberry Pi touchscreen resolution
-        self.current_frame = None
+
+        # Every screen is built once and then shown/updated in place
+        self.screens = ScreenManager(self, {
+            "welcome": WelcomeScreen,
+            "eye_selection": EyeSelectionScreen,
+            "countdown": CountdownScreen,
+            "captured_photo": CapturedPhotoScreen,
+            "processing": ProcessingScreen,
+            "results": ResultsScreen,
+            "simulation": SimulationScreen,
+        })
         self.selected_eye = None  # Store selected eye (Left or Right)
         self.left_eye_taken = False  # Track if left eye photo is captured
         self.right_eye_taken = False  # Track if right eye photo is captured
 
         self.selected_images = []
-        # For simulation selected images and scanning (PiOS)
-        self.demo_client = DemoClient(images_dir='/home/RetinAi/Desktop/Embedded/raspi_raw', csv_dir='/home/RetinAi/Desktop/Embedded/test.csv')
-        # For simulation selected images and scanning (Windows)
-        # self.demo_client = DemoClient(images_dir='../../Embedded/raspi_raw', csv_dir='../../Embedded/test.csv')
+        self._demo_client = None  # Created on first use, see demo_client
+        self._session = None  # Scan session of the current patient, see session
+        self._uploader = None  # Background uploader of the scan sessions, see uploader
+        self._uploader_lock = threading.Lock()  # the boot thread starts the uploader
+        self._awaiting_session = None  # ID of the session the processing screen waits for
+        self._preview_stream = None  # Live preview of the camera session, see preview_stream
+
+        # Cached listing and thumbnails of the simulation images (PiOS)
+        self.sample_index = DirectoryIndex(Path('/home/RetinAi/Desktop/Embedded/raspi_raw'), "*.jpg")
+        # Cached listing and thumbnails of the simulation images (Windows)
+        # self.sample_index = DirectoryIndex(Path('../../Embedded/raspi_raw'), "*.jpg")
+        self.thumbnails = ThumbnailCache()
+
+    @property
+    def demo_client(self):
+        """DemoClient for the simulation screens, created the first time it is needed."""
+        if self._demo_client is None:
+            from vision.demo_diagnoses import DemoClient
+            # For simulation selected images and scanning (PiOS)
+            self._demo_client = DemoClient(images_dir='/home/RetinAi/Desktop/Embedded/raspi_raw', csv_dir='/home/RetinAi/Desktop/Embedded/test.csv')
+            # For simulation selected images and scanning (Windows)
+            # self._demo_client = DemoClient(images_dir='../../Embedded/raspi_raw', csv_dir='../../Embedded/test.csv')
+        return self._demo_client
+
+    @property
+    def session(self):
+        """Scan session of the current patient, created on the first capture (imports NumPy)."""
+        if self._session is None:
+            from vision.scan_session import ScanSession, prune_sessions
+            root_dir = self.camera.output_dir if self.camera is not None else imagesLocation
+            prune_sessions(root_dir, protected=self.uploader.queue.pending_ids())
+            self._session = ScanSession(root_dir)
+            print(f"Started scan session {self._session.session_id}")
+        return self._session
+
+    @property
+    def uploader(self):
+        """Uploader draining the store-and-forward queue, started on first use (or at boot)."""
+        with self._uploader_lock:
+            if self._uploader is None:
+                from network.uploadQueue import UploadQueue, Uploader
+                from network.exampleClientVariables import upload_batch_size, upload_batch_linger
+                batching = None
+                if upload_batch_size > 1:
+                    from network.batchingClient import BatchingClient
+                    batching = BatchingClient(max_batch_size=upload_batch_size, max_linger=upload_batch_linger)
+                self._uploader = Uploader(UploadQueue(), batching=batching)
+            return self._uploader
+
+    def close_uploader(self):
+        """Stop the uploader if it was started, pending sessions stay queued on disk."""
+        with self._uploader_lock:
+            if self._uploader is not None:
+                self._uploader.close()
+                self._uploader = None
+
+    @property
+    def preview_stream(self):
+        """Live preview stream of the camera session, None until the camera is open."""
+        if self._preview_stream is None and self.camera is not None:
+            from vision.preview_stream import PreviewStream
+            self._preview_stream = PreviewStream(self.camera, fps=CountdownScreen.preview_fps)
+        return self._preview_stream
 
     def start(self):
         """Start the application by showing the welcome screen."""
@@ -63,139 +161,54 @@ class TouchscreenUI:
         # Reset flags for left and right eye capture
         self.left_eye_taken = False
         self.right_eye_taken = False
+        # The next patient gets a new session, a previous upload still running keeps its own
+        if self._session is not None and self._uploader is not None:
+            self._uploader.discard(self._session.session_id)  # early uploads of an abandoned session
+        self._session = None
+        self._awaiting_session = None
 
         # disable fullscreen for testing
         self.root.attributes('-fullscreen', True)
-        self._clear_frame()
-
-        # Open and set assets
-        bg_image = Image.open(BASE_PATH / "assets/start/Start Screen Background.png")
-        start_button_image = Image.open(BASE_PATH / "assets/start/Start Scan Button.png")
-        simulation_button_image = Image.open(BASE_PATH / "assets/start/Simulation Button.png")
-
-        self.bg_photo = ImageTk.PhotoImage(bg_image)
-        self.start_button_image = ImageTk.PhotoImage(start_button_image)
-        self.simulation_button_photo = ImageTk.PhotoImage(simulation_button_image)
-
-        # Set Canvas background image
-        canvas = tk.Canvas(self.current_frame, width=1280, height=720)
-        canvas.create_image(0, 0, image=self.bg_photo, anchor="nw")
-        canvas.pack(fill="both", expand=True)
-
-        # Set start button position and bind
-        button_x, button_y = 640, 360
-        canvas_button = canvas.create_image(button_x, button_y, image=self.start_button_image)
-        def on_click(event):
-            self.show_eye_selection_screen()
-        canvas.tag_bind(canvas_button, "<Button-1>", on_click)
-
-        # Set simulation button position and bind
-        sim_button_x, sim_button_y = 1125, 650
-        canvas_simulation_button = canvas.create_image(sim_button_x, sim_button_y, image=self.simulation_button_photo)
-        def on_simulation_click(event):
-            self.show_simulation_screen()
-        canvas.tag_bind(canvas_simulation_button, "<Button-1>", on_simulation_click)
+        self.screens.show("welcome")
 
     def show_simulation_screen(self):
         """
         Show the simulation screen with six selectable images.
         """
-        self._clear_frame()
-
         # Reset selected images
         self.selected_images = []
 
-        # Open and set assets
-        sim_bg_image = Image.open(BASE_PATH / "assets/simulation screen/simulation background.png")
-        sim_next_image = Image.open(BASE_PATH / "assets/simulation screen/Next button.png")
-        sim_back_image = Image.open(BASE_PATH / "assets/simulation screen/Back Button.png")
-        sim_regresh_image = Image.open(BASE_PATH / "assets/simulation screen/Refresh Button.png")
-
-        self.sim_bg_photo = ImageTk.PhotoImage(sim_bg_image)
-        self.sim_next_photo = ImageTk.PhotoImage(sim_next_image)
-        self.sim_back_photo = ImageTk.PhotoImage(sim_back_image)
-        self.sim_refresh_photo = ImageTk.PhotoImage(sim_regresh_image)
-
-        # Set Canvas background image
-        canvas = tk.Canvas(self.current_frame, width=1280, height=720)
-        canvas.create_image(0, 0, image=self.sim_bg_photo, anchor="nw")
-        canvas.pack(fill="both", expand=True)
-
-        # Create next, back, and refresh buttons
-        self.create_button(canvas, 1200, 660, self.sim_next_photo,self.submit_selected_images)
-        self.create_button(canvas, 60, 60, self.sim_back_photo,self.show_welcome_screen)
-        self.create_button(canvas, 60, 660, self.sim_refresh_photo,self.show_simulation_screen)
-
-        # Define image_dir as a Path object (PiOS)
-        image_dir = Path('/home/RetinAi/Desktop/Embedded/raspi_raw')
-        # Define image_dir as a Path object (Windows)
-        # image_dir = Path('../../Embedded/raspi_raw')
-
-        # Randomly select 6 images from the directory
+        # Randomly select 6 images from the cached directory listing
         try:
-            image_file_names = random.sample(list(image_dir.glob("*.jpg")), 6)
+            image_file_names = self.sample_index.sample(6)
         except ValueError:
             messagebox.showerror("Error", "Not enough images in the directory!")
             return
 
-        # Initialize dictionaries to track buttons and their states
-        self.image_buttons = {}
-
-        # 2x3 Grid placement of random images
-        button_width, button_height = 200, 200  # Button size
-        padding_x, padding_y = 95, 80  # Padding between buttons
-        start_x, start_y = 365, 260  # Starting position
+        # Load the cached thumbnails of the images
+        button_size = (SimulationScreen.button_width, SimulationScreen.button_height)
+        thumbnails = [self.thumbnails.get(image_file, button_size) for image_file in image_file_names]
 
-        for i, image_file in enumerate(image_file_names):
-            # Calculate position for each button in grid
-            row = i // 3
-            col = i % 3
-            x = start_x + col * (button_width + padding_x)
-            y = start_y + row * (button_height + padding_y)
-
-            # Load and resize the image
-            img = Image.open(image_file).resize((button_width, button_height), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
-
-            # Create a button for the image directly on the canvas
-            btn = tk.Button(
-                canvas,
-                image=photo,
-                command=lambda f=image_file: self.select_image(f),
-                relief="flat", bg="white"
-            )
-            btn.image = photo  # Keep a reference to avoid garbage collection
-
-            # Place the button on the canvas at calculated coordinates
-            canvas.create_window(x, y, window=btn)
-
-            # Store the button in the dictionary for later updates
-            self.image_buttons[image_file] = btn
-
-            # Create a label for the image name and place it below the button
-            label_text = image_file.name if hasattr(image_file, "name") else str(image_file)
-            label = tk.Label(canvas, text=label_text, font=("Helvetica", 12), bg="white")
-            canvas.create_window(x, y + button_height // 2 + 15, window=label)
+        self.screens.show("simulation", image_files=image_file_names, thumbnails=thumbnails)
 
     def select_image(self, image_file):
         """
         Select or deselect an image.
         """
-        if not hasattr(self, 'selected_images'):
-            self.selected_images = []  # Initialize selected_images if not already defined
+        simulation_screen = self.screens.get("simulation")
 
         if image_file in self.selected_images:
             # Deselect the image
             self.selected_images.remove(image_file)
 
             # Update button appearance to indicate deselection (reset to default)
-            self.image_buttons[image_file].config(relief="flat", bg="SystemButtonFace")
+            simulation_screen.set_selected(image_file, False)
         elif len(self.selected_images) < 2:
             # Select the image
             self.selected_images.append(image_file)
 
             # Update button appearance to indicate selection (e.g., gray out)
-            self.image_buttons[image_file].config(relief="sunken", bg="lightgray")
+            simulation_screen.set_selected(image_file, True)
         else:
             # Show a popup if trying to select more than two images
             messagebox.showwarning("Selection Limit", "You can only select up to two images.")
@@ -205,7 +218,7 @@ class TouchscreenUI:
         Submit selected images for scanning.
         """
         # Ensure exactly two images are selected
-        if not hasattr(self, 'selected_images') or len(self.selected_images) != 2:
+        if len(self.selected_images) != 2:
             messagebox.showerror("Error", "Please select exactly two images!")
             return
 
@@ -215,306 +228,268 @@ class TouchscreenUI:
         # DEBUG: Print filenames being submitted
         print(f"Submitting filenames: {image_filenames}")
 
-        try:
-            start_time = time.time()
-            results = self.demo_client.send_images_and_get_diagnosis(image_filenames)
-            elapsed_time = time.time() - start_time
+        demo_client = self.demo_client  # created on the UI thread
 
-            print(f"Diagnosis Results: {results}")  # DEBUG: Print API response
+        def send(job):
+            job.report_progress("Sending images to the server...")
+            with get_metrics().timer("demo.request") as timer:
+                results = demo_client.send_images_and_get_diagnosis(image_filenames)
+            elapsed_time = timer.elapsed
+            print(f"Diagnosis Results: {results} ({elapsed_time:.2f} seconds)")  # DEBUG: Print API response
+            return results
 
-            # Navigate to results screen with diagnosis results
-            self.show_results_sim_screen(image_filenames, results)
-
-        except requests.ConnectionError as e:
-            messagebox.showerror("Connection Error", f"Failed to connect to the server:\n{str(e)}")
-        except requests.HTTPError as e:
-            messagebox.showerror("HTTP Error", f"Server returned an error:\n{str(e)}")
-        except FileNotFoundError as e:
-            messagebox.showerror("File Error", f"File not found:\n{str(e)}")
-        except Exception as e:
-            messagebox.showerror("Error", f"An unexpected error occurred:\n{str(e)}")
+        # Navigate to results screen with diagnosis results once the request finishes
+        self._run_with_processing_screen(
+            "simulation submit", send,
+            "Analyzing images...",
+            on_done=lambda results: self.show_results_sim_screen(image_filenames, results),
+            on_cancel=self.show_simulation_screen,
+        )
 
     def show_results_sim_screen(self, image_filenames, results):
         """
         Show the results screen with images and their diagnosis results side by side
         """
-        self._clear_frame()
-
-        # Open and set assets
-        sim_results_bg_image = Image.open(BASE_PATH / "assets/results screen/results background.png")
-        sim_results_finish_image = Image.open(BASE_PATH / "assets/results screen/finish button.png")
-
-        self.sim_background_bg_photo = ImageTk.PhotoImage(sim_results_bg_image)
-        self.sim_finish_photo = ImageTk.PhotoImage(sim_results_finish_image)
+        image_size = (ResultsScreen.image_width, ResultsScreen.image_height)
 
-        # Set Canvas background image
-        canvas = tk.Canvas(self.current_frame, width=1280, height=720)
-        canvas.create_image(0, 0, image=self.sim_background_bg_photo, anchor="nw")
-        canvas.pack(fill="both", expand=True)
-
-        # Define positions and dimensions for images and labels
-        image_width, image_height = 350, 350  # Image size
-        padding_x, padding_y = 120, 20  # Padding between elements
-        start_x, start_y = 405, 400  # Starting position for first image
-
-        for i, result in enumerate(results):
+        tiles = []
+        for result in results[:ResultsScreen.tile_count]:
             filename = result['filename']
             diagnosis = result['diagnosis']
             is_correct = result['is_correct']
 
             # Load and resize the image
             img_path = Path(self.demo_client.images_dir) / filename
-            img = Image.open(img_path).resize((image_width, image_height), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
-
-            # Calculate position for each image and label
-            x = start_x + i * (image_width + padding_x)
-            y = start_y
-
-            # Create a button or label for the image directly on the canvas
-            img_label = tk.Label(canvas, image=photo)
-            img_label.image = photo  # Keep a reference to avoid garbage collection
-            canvas.create_window(x, y, window=img_label)
+            img = self.thumbnails.get(img_path, image_size)
 
-            # Create a label for the diagnosis result below the image
+            # Diagnosis result below the image
             result_text = (
                 f"Filename: {filename}\n"
                 f"Diagnosis: {diagnosis}\n"
                 f"Correct: {'Yes' if is_correct else 'No'}"
             )
-            result_label = tk.Label(
-                canvas,
-                text=result_text,
-                font=("Helvetica", 14),
-                fg="green" if is_correct else "red",
-                justify="left",
-                bg="white"
-            )
-            canvas.create_window(x, y + image_height // 2 + 45, window=result_label)
-
-        # Create finish button
-        self.create_button(canvas, 1200, 660, self.sim_finish_photo,self.show_welcome_screen)
+            tiles.append((img, result_text, "green" if is_correct else "red", "left"))
 
-    def create_button(self, canvas, x, y, img, event_function=None, *args, **kwargs):
-        button = canvas.create_image(x, y, image=img)
-        if event_function is not None:
-            canvas.tag_bind(button, "<Button-1>", lambda event: event_function(*args, **kwargs))
-        return button
+        self.screens.show("results", tiles=tiles)
 
     def show_eye_selection_screen(self):
         """
         Show the eye selection screen for capturing left and right eye images.
         """
-        self._clear_frame()
-
-        # Open and set assets
-        bg_select_eye_image = Image.open(BASE_PATH / "assets/eye select/Eye Selection screen.png")
-        back_button_image = Image.open(BASE_PATH / "assets/eye select/Back Button.png")
-        submit_button_image = Image.open(BASE_PATH / "assets/eye select/Submit.png")
-        submit_button_disabled_image = Image.open(BASE_PATH / "assets/eye select/Submit.png")
-        select_left_eye_image = Image.open(BASE_PATH / "assets/eye select/left eye.png")
-        select_left_eye_disabled_image = Image.open(BASE_PATH / "assets/eye select/left eye disabled.png")
-        select_right_eye_image = Image.open(BASE_PATH / "assets/eye select/right eye.png")
-        select_right_eye_disabled_image = Image.open(BASE_PATH / "assets/eye select/right eye disabled.png")
-
-        self.bg_select_eye_image = ImageTk.PhotoImage(bg_select_eye_image)
-        self.back_button_image = ImageTk.PhotoImage(back_button_image)
-        self.submit_button_image = ImageTk.PhotoImage(submit_button_image)
-        self.submit_button_disabled_image = ImageTk.PhotoImage(submit_button_disabled_image)
-        self.select_left_eye_image = ImageTk.PhotoImage(select_left_eye_image)
-        self.select_left_eye_disabled_image = ImageTk.PhotoImage(select_left_eye_disabled_image)
-        self.select_right_eye_image = ImageTk.PhotoImage(select_right_eye_image)
-        self.select_right_eye_disabled_image = ImageTk.PhotoImage(select_right_eye_disabled_image)
-
-        # Set Canvas background image
-        canvas = tk.Canvas(self.current_frame, width=1280, height=720)
-        canvas.create_image(0, 0, image=self.bg_select_eye_image, anchor="nw")
-        canvas.pack(fill="both", expand=True)
-
-        # Set start button position and bind
-        back_b_x, back_b_y = 80, 75
-        l_b_x, l_b_y = 380, 400
-        r_b_x, r_b_y = 900, 400
-        s_b_x, s_b_y = 1200, 650
-        
-        self.create_button(canvas, back_b_x, back_b_y, self.back_button_image, self.show_welcome_screen)
-
-        # Left Eye button
-        if not self.left_eye_taken:
-            self.create_button(canvas, l_b_x, l_b_y, self.select_left_eye_image, self.capture_photo_with_countdown, "Left")
-        else:
-            self.create_button(canvas, l_b_x, l_b_y, self.select_left_eye_disabled_image)
-
-        # Right Eye button
-        if not self.right_eye_taken:
-            self.create_button(canvas, r_b_x, r_b_y, self.select_right_eye_image, self.capture_photo_with_countdown, "Right")
-        else:
-            self.create_button(canvas, r_b_x, r_b_y, self.select_right_eye_disabled_image)
-
-        # Submit button, greyed out until both eyes are captured
-        if self.left_eye_taken and self.right_eye_taken:
-            self.create_button(canvas, s_b_x, s_b_y, self.submit_button_image, self.submit_images_and_show_results)
-        else:
-            self.create_button(canvas, s_b_x, s_b_y, self.submit_button_disabled_image)
+        self.screens.show("eye_selection", left_taken=self.left_eye_taken, right_taken=self.right_eye_taken)
 
     def capture_photo_with_countdown(self, side):
         """
         Show a countdown screen for 5 seconds, capture the photo, display it briefly, 
         and return to the eye selection screen.
         """
-        self._clear_frame()
-
-        bg_count_down_image = Image.open(BASE_PATH / "assets/timer screen/Timer Background.png")
-        self.bg_count_down_image = ImageTk.PhotoImage(bg_count_down_image)
-
-        # Set Canvas background image
-        canvas = tk.Canvas(self.current_frame, width=1280, height=720)
-        canvas.create_image(0, 0, image=self.bg_count_down_image, anchor="nw")
-        canvas.pack(fill="both", expand=True)
-
-        countdown_text_id = canvas.create_text(640, 450, text="5", font=("M Plus 1", 150), fill="white")
+        session = self.session
+        countdown_screen = self.screens.show("countdown", seconds_left=3)
+        if self.preview_stream is not None:
+            countdown_screen.start_preview(self.preview_stream)
 
         def update_countdown(seconds_left):
             if seconds_left > 0:
-                canvas.itemconfig(countdown_text_id, text=str(seconds_left))
-                self.current_frame.after(1000, update_countdown, seconds_left - 1)  # Call again after 1 second
+                countdown_screen.update(seconds_left=seconds_left)
+                self.root.after(1000, update_countdown, seconds_left - 1)  # Call again after 1 second
             else:
-                # Capture the photo after countdown finishes
-                try:
-                    # Define filename based on side of the eye
-                    filename = f"1_{side.lower()}.jpg"
-                    filepath = f"/home/RetinAi/Desktop/firmware/RetinAI-Firmware/src/vision/captured_photos/{filename}"
-
-                    # Check if a file with the same name exists and remove it
-                    file_path = Path(filepath)
-                    if file_path.exists():
-                        print(f"Existing file found: {filepath}. It will be overwritten.")
-                        file_path.unlink()  # Delete the existing file
-
-                    # Call external capture_photo function with side as an argument
-                    capture_photo(side.lower())  # Ensure `capture_photo` uses consistent naming
-
-                    # Update flags based on which eye was captured
-                    if side == "Left":
-                        self.left_eye_taken = True
-                    elif side == "Right":
-                        self.right_eye_taken = True
-
-                    # Display the captured photo briefly
-                    self.display_captured_photo(filepath)
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to capture {side} eye photo: {str(e)}")
-                    self.show_eye_selection_screen()  # Return to selection screen in case of error
+                # Capture the photo after countdown finishes, off the UI thread
+                countdown_screen.stop_preview()
+                self._run_with_processing_screen(
+                    f"capture {side}", capture, "Capturing photo...",
+                    on_done=on_captured,
+                    on_error=on_capture_failed,
+                )
+
+        def capture(job):
+            # Grab a frame from the warm camera session, it stays in memory for the preview and upload
+            if self.camera is None:
+                self.camera = initialize_camera()
+            with get_metrics().timer("ui.capture", session.session_id):
+                frame = self.camera.capture_frame(side.lower(), session.stats, progress=job.report_progress)
+            if frame.quality is not None and not frame.quality.passed:
+                # Not worth an upload, the patient retakes this eye
+                from vision.quality import CaptureQualityError
+                raise CaptureQualityError(frame.quality)
+
+            # Archive it once in the session directory, a retake of this eye is replaced atomically
+            job.report_progress("Saving photo...")
+            with get_metrics().timer("ui.archive", session.session_id):
+                frame = session.add(frame, side.lower())
+
+            # Evaluate this eye while the patient is repositioned for the other one
+            if upload_pipelined:
+                self.uploader.upload_image(session, frame)
+            return frame
+
+        def on_captured(frame):
+            # Update flags based on which eye was captured
+            if side == "Left":
+                self.left_eye_taken = True
+            elif side == "Right":
+                self.right_eye_taken = True
+
+            # Display the captured photo briefly
+            self.display_captured_photo(frame)
+
+        def on_capture_failed(e):
+            messagebox.showerror("Error", f"Failed to capture {side} eye photo: {str(e)}")
+            self.show_eye_selection_screen()  # Return to selection screen in case of error
 
         update_countdown(3)  # Start countdown from 3 seconds
 
-    def display_captured_photo(self, filepath):
+    def display_captured_photo(self, frame):
         """
         Display the captured photo for 1-2 seconds before returning to the eye selection screen.
         """
-        self._clear_frame()
+        # Preview straight from the in-memory frame, no decode of the saved JPEG
+        self.screens.show("captured_photo", image=frame.preview(CapturedPhotoScreen.photo_size))
 
-        # Load background image and convert it to a PhotoImage for Tkinter
-        bg_picture_taken_image = Image.open(BASE_PATH / "assets/picture taken/picture taken.png")
-        self.bg_picture_taken_image = ImageTk.PhotoImage(bg_picture_taken_image)
+        # Return to eye selection screen after 2 seconds
+        self.root.after(2000, self.show_eye_selection_screen)
 
-        # Create a canvas with the desired dimensions
-        canvas = tk.Canvas(self.current_frame, width=1280, height=720)
-        # Place the background image at the top-left corner
-        canvas.create_image(0, 0, image=self.bg_picture_taken_image, anchor="nw")
-        canvas.pack(fill="both", expand=True)
+    def submit_images_and_show_results(self):
+        """
+        Submit captured images to the backend API and display results.
+        """
+        session = self.session
 
-        try:
-            # Load the captured image and resize it for display
-            img = Image.open(filepath).resize((500, 400))
-            self.captured_photo = ImageTk.PhotoImage(img)
+        # Queue the session, the background uploader sends it and keeps retrying while the server is unreachable
+        self.uploader.submit(session)
+        self._awaiting_session = session.session_id
 
-            # Create the captured photo on the canvas, centered
-            canvas.create_image(655 , 400, image=self.captured_photo, anchor="center")
+        def cancel():
+            # The upload stays queued, submitting again picks up the same queue entry
+            self._awaiting_session = None
+            self.show_eye_selection_screen()
 
-            # Return to eye selection screen after 2 seconds
-            self.current_frame.after(2000, self.show_eye_selection_screen)
+        self.screens.show("processing", message="Analyzing images...", on_cancel=cancel)
+        self._poll_result(session, time.monotonic())
 
-        except FileNotFoundError:
-            messagebox.showerror("Error", f"Photo not found: {filepath}")
-            self.show_eye_selection_screen()  # Return to selection screen in case of error
+    def _poll_result(self, session, started, shown=0):
+        """
+        Poll the upload queue until the session's results arrive, then show them.
+        Results of single eyes are shown as soon as they arrive.
 
-    def submit_images_and_show_results(self):
+        Args:
+            shown: Number of image results already on the results screen.
         """
-        Submit captured images to the backend API and display results.
+        if self._awaiting_session != session.session_id:
+            return  # cancelled, or the patient moved on
+
+        status = self.uploader.status(session.session_id)
+        metrics = get_metrics()
+        partial = status["partial"]
+        if status["status"] not in ("done", "failed") and partial is not None and len(partial["image_Info"]) > shown:
+            # Show the eyes evaluated so far, the others keep a placeholder
+            if shown == 0:
+                metrics.record("ui.first_result", time.monotonic() - started, session.session_id)
+            received = {info["name"] for info in partial["image_Info"]}
+            self.show_results_screen(partial, session, pending=[name for name in sorted(session.images) if name not in received])
+            shown = len(partial["image_Info"])
+        if status["status"] == "done":
+            self._awaiting_session = None
+            metrics.record("ui.result_wait", time.monotonic() - started, session.session_id)
+            with metrics.timer("ui.results", session.session_id):
+                self.show_results_screen(status["result"], session)
+            metrics.end_session(session.session_id, outcome="done", attempts=status["attempts"])
+            return
+        if status["status"] == "failed":
+            self._awaiting_session = None
+            metrics.end_session(session.session_id, outcome="failed", attempts=status["attempts"])
+            messagebox.showerror("HTTP Error", f"Server returned an error:\n{status['error']}")
+            self.show_eye_selection_screen()
+            return
+
+        if status["error"] is not None:
+            if self.screens.current_name == "processing":
+                self.screens.get("processing").set_status("Server unreachable, retrying...")
+            if time.monotonic() - started > OFFLINE_NOTICE_AFTER:
+                # Let the next patient start, the session is sent once the server is back
+                self._awaiting_session = None
+                metrics.end_session(session.session_id, outcome="queued", attempts=status["attempts"])
+                messagebox.showinfo("Scan Saved", "The server can't be reached right now.\n"
+                                    "Your scan has been saved and will be sent automatically.")
+                self.show_welcome_screen()
+                return
+
+        self.root.after(UPLOAD_POLL_MS, self._poll_result, session, started, shown)
+
+    def _run_with_processing_screen(self, name, fn, message, on_done, on_error=None, on_cancel=None):
         """
-        try:
-            # Send POST request with both images
-            response = backendRequests("post")  # Call postRequest() from exampleClient.py
-            
-            # Check response status
-            if response.status_code == 200:
-                # Parse JSON response
-                results = response.json()  # Convert JSON response to Python dictionary
-                
-                # Extract filenames of captured images from the directory
-                image_files = os.listdir(imagesLocation)
-                image_paths = [os.path.join(imagesLocation, img) for img in image_files]
-                
-                # Show results screen with images and diagnosis
-                self.show_results_screen(results)
+        Run fn on the background job runner while an animated processing screen is shown.
+
+        Args:
+            name: Name of the job (for logging).
+            fn: Function taking the Job, run off the UI thread.
+            message: Text shown on the processing screen.
+            on_done: Called on the UI thread with the result.
+            on_error: Called on the UI thread with the exception (defaults to an error popup).
+            on_cancel: If given, a cancel button is shown and this is called after cancelling.
+        """
+        def cancel():
+            if self.current_job is not None:
+                self.current_job.cancel()
+                self.current_job = None
+            on_cancel()
+
+        def failed(e):
+            if on_error is not None:
+                on_error(e)
             else:
-                messagebox.showerror("Error", f"Failed to get results: {response.status_code}")
-        
-        except requests.ConnectionError as e:
+                self._show_request_error(e)
+                if on_cancel is not None:
+                    on_cancel()
+
+        processing_screen = self.screens.show("processing", message=message, on_cancel=cancel if on_cancel is not None else None)
+        self.current_job = self.jobs.submit(
+            name, fn,
+            on_done=on_done,
+            on_error=failed,
+            on_progress=processing_screen.set_status,
+        )
+
+    def _show_request_error(self, e):
+        """
+        Show an error popup for a failed capture or server request.
+        """
+        import requests
+
+        if isinstance(e, requests.ConnectionError):
             messagebox.showerror("Connection Error", f"Failed to connect to the server:\n{str(e)}")
-        except requests.HTTPError as e:
+        elif isinstance(e, requests.HTTPError):
             messagebox.showerror("HTTP Error", f"Server returned an error:\n{str(e)}")
-        except FileNotFoundError as e:
+        elif isinstance(e, FileNotFoundError):
             messagebox.showerror("File Error", f"File not found:\n{str(e)}")
-        except Exception as e:
+        else:
             messagebox.showerror("Error", f"An unexpected error occurred:\n{str(e)}")
 
-    def show_results_screen(self, results):
+    def show_results_screen(self, results, session=None, pending=()):
         """
         Display submitted images and their respective diagnosis results side by side
-        """
-        self._clear_frame()
-
-        results_bg_image = Image.open(BASE_PATH / "assets/results screen/results background.png")
-        finish_button_image = Image.open(BASE_PATH / "assets/results screen/finish button.png")
 
-        self.results_bg_photo = ImageTk.PhotoImage(results_bg_image)
-        self.finish_button_photo = ImageTk.PhotoImage(finish_button_image)
-
-        # Set Canvas background image
-        canvas = tk.Canvas(self.current_frame, width=1280, height=720)
-        canvas.create_image(0, 0, image=self.results_bg_photo, anchor="nw")
-        canvas.pack(fill="both", expand=True)
-
-        # Define positions and dimensions for images and labels
-        image_width, image_height = 350, 350  # Image size
-        padding_x, padding_y = 120, 20  # Padding between elements
-        start_x, start_y = 405, 400  # Starting position for first image
+        Args:
+            pending: Names of images whose results haven't arrived yet, shown with a placeholder.
+        """
+        session = session or self.session
+        image_size = (ResultsScreen.image_width, ResultsScreen.image_height)
+
+        # Display first two images from results, in name order (left before right) when some are still pending
+        entries = [(image_info["name"], image_info) for image_info in results["image_Info"]]
+        if pending:
+            entries = sorted(entries + [(name, None) for name in pending], key=lambda entry: entry[0])
+        tiles = []
+        for filename, image_info in entries[:ResultsScreen.tile_count]:
+            img = result_image(session, filename, image_size)
+            if image_info is None:
+                tiles.append((img, f"{filename}\nAnalyzing...\n", "gray", "center"))
+                continue
 
-        # Display first two images from results
-        for i, image_info in enumerate(results["image_Info"][:2]):
-            filename = image_info["name"]
             eye_side = image_info["eyeSide"]
             prediction = image_info["prediction"]
             selected = image_info["selectedForDisp"]
 
-            # Load and resize the image
-            img_path = Path(imagesLocation) / filename
-            img = Image.open(img_path).resize((image_width, image_height), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
-
-            # Calculate position for each image and label
-            x = start_x + i * (image_width + padding_x)
-            y = start_y
-
-            # Create image label directly on canvas
-            img_label = tk.Label(canvas, image=photo)
-            img_label.image = photo
-            canvas.create_window(x, y, window=img_label)
-
-            # Create info label below image
-            result_text = ("")
+            # Info text below image
             if prediction:
                 result_text = (
                     f"{filename}\n"
@@ -525,18 +500,11 @@ class TouchscreenUI:
                     f"{filename}\n"
                     f"Prediction: Inconclusive\n"
                 )
-            result_label = tk.Label(
-                canvas,
-                text=result_text,
-                font=("Helvetica", 14),
-                fg="black",  # White text color
-                justify="center",
-                bg="white"  # Transparent background
-            )
-            canvas.create_window(x, y + image_height // 2 + 45, window=result_label)
+            tiles.append((img, result_text, "black", "center"))
 
-        # Create finish button
-        self.create_button(canvas, 1200, 660, self.finish_button_photo, self.show_welcome_screen)
+        self.screens.show("results", tiles=tiles)
+        if not pending:
+            session.stats.report()
 
     # def show_success_screen(self):
     #     """
@@ -562,11 +530,9 @@ class TouchscreenUI:
     #     done_button = tk.Button(self.current_frame, text="Done", font=("Helvetica", 16), command=self.show_welcome_screen)
     #     done_button.pack(pady=20)
 
-    def _clear_frame(self):
+    def transition_report(self):
         """
-        Clear the current frame and create a new one.
+        Print the screen transition latency per screen.
         """
-        if self.current_frame:
-            self.current_frame.destroy()
-        self.current_frame = tk.Frame(self.root)
-        self.current_frame.pack(fill="both", expand=True)
+        for name, (count, mean_ms, max_ms) in self.screens.transition_report().items():
+            print(f"{name}: {count} transitions, mean {mean_ms:.1f} ms, max {max_ms:.1f} ms")
@@ -0,0 +1,91 @@
+"""
+Screen Transition Benchmark
+
+Run from src/: python -m interface.transition_test [rounds]
+
+Features:
+- Opens the touchscreen UI without a camera and walks the welcome, eye selection, captured photo,
+  results and simulation screens ROUNDS times, with a synthetic full resolution capture of each eye
+- Times every show call until Tk has drawn the screen and the X server has processed it (update)
+- Prints the first visit and the median repeat visit of each screen
+- measure() only needs callables showing a screen, so the same loop can time an older checkout
+  (e.g. the destroy-and-rebuild screens) for a before/after comparison
+"""
+import sys
+import time
+import statistics
+import tempfile
+import tkinter as tk
+from pathlib import Path
+
+from PIL import Image
+from benchmark import fundus_frame
+from interface.thumbnail_cache import DirectoryIndex
+from interface.touchscreen_ui import TouchscreenUI
+from vision.camera_impl import CAPTURE_SIZE
+from vision.frame_buffer import Frame
+from vision.scan_session import ScanSession
+
+ROUNDS = 20
+SIMULATION_IMAGES = 6
+
+def measure(root, steps, rounds=ROUNDS):
+    """
+    Run every (name, show) step rounds times.
+
+    Returns:
+        dict: Screen name -> transition times in ms, in visit order.
+    """
+    timings = {name: [] for name, _ in steps}
+    for _ in range(rounds):
+        for name, show in steps:
+            start_time = time.perf_counter()
+            show()
+            root.update()
+            timings[name].append(1000 * (time.perf_counter() - start_time))
+    return timings
+
+def report(timings):
+    for name, times in timings.items():
+        repeats = times[1:] or times
+        print(f"{name}: first {times[0]:.1f} ms, repeat median {statistics.median(repeats):.1f} ms, "
+              f"max {max(repeats):.1f} ms")
+
+def kiosk_steps(ui, directory):
+    """Screens of a patient flow, with a synthetic capture of each eye and sample images for the simulation."""
+    session = ScanSession(directory)
+    frame = fundus_frame(CAPTURE_SIZE)
+    for side in ("left", "right"):
+        session.add(Frame(frame, f"1_{side}.jpg", session.stats), side)
+    results = {"image_Info": [
+        {"name": name, "eyeSide": side, "prediction": "Normal", "selectedForDisp": True}
+        for name, side in (("1_left.jpg", "left"), ("1_right.jpg", "right"))
+    ]}
+
+    samples = Path(directory) / "samples"
+    samples.mkdir()
+    for index in range(SIMULATION_IMAGES):
+        Image.fromarray(frame).save(samples / f"{index:04d}.jpg", "JPEG")
+    ui.sample_index = DirectoryIndex(samples, "*.jpg")
+
+    return [
+        ("welcome", ui.show_welcome_screen),
+        ("eye_selection", ui.show_eye_selection_screen),
+        ("captured_photo", lambda: ui.display_captured_photo(session.get("1_left.jpg"))),
+        ("results", lambda: ui.show_results_screen(results, session)),
+        ("simulation", ui.show_simulation_screen),
+    ]
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else ROUNDS
+    root = tk.Tk()
+    ui = TouchscreenUI(root)
+    with tempfile.TemporaryDirectory() as directory:
+        timings = measure(root, kiosk_steps(ui, directory), rounds)
+    root.destroy()
+
+    print(f"Screen transitions over {rounds} rounds:")
+    report(timings)
+
+if __name__ == "__main__":
+    main()
@@ -8,21 +8,163 @@ Features:
 - tkinter User interface for instructions, input, and diagnosis results
 - Vision system to take retinal photos
 - Network commands to send and receive information from the ML server
+- Welcome screen is painted first, heavy modules and the camera load in the background
+- --profile-startup prints an import-time/phase breakdown of the boot
+- Per-stage latency metrics logged to metrics_path, optionally served on --metrics-port
 
 """
+import time
+START_TIME = time.perf_counter()  # taken before any other import so the profile covers them
 
+import argparse
+import importlib
+import sys
+import threading
 import tkinter as tk
-from interface.touchscreen_ui import TouchscreenUI
+
+# Modules loaded in the background after the welcome screen is visible, heaviest first
+BACKGROUND_IMPORTS = [
+    "numpy",
+    "requests",
+    "network.backendClient",
+    "network.exampleClient",
+    "network.uploadQueue",
+    "vision.fundus_crop",
+    "vision.demo_diagnoses",
+]
+
+class StartupProfiler:
+    """
+    Records how long each boot phase and background import takes.
+
+    Args:
+        enabled: Only print the report when profiling was requested.
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = []  # (name, start offset, duration, thread name)
+        self._lock = threading.Lock()
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def record(self, name, start, end):
+        with self._lock:
+            self.phases.append((name, start - START_TIME, end - start, threading.current_thread().name))
+
+    def mark(self, name):
+        """Record an instant, e.g. the first frame being painted."""
+        now = time.perf_counter()
+        self.record(name, now, now)
+
+    def report(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            phases = sorted(self.phases, key=lambda phase: phase[1])
+        print("Startup profile (ms since process start):")
+        print(f"  {'start':>8} {'duration':>9}  {'thread':<12} phase")
+        for name, start, duration, thread in phases:
+            print(f"  {1000 * start:8.1f} {1000 * duration:9.1f}  {thread:<12} {name}")
+
+class _Phase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+
+def background_init(app, profiler, metrics_port=None):
+    """
+    Load heavy modules, open the camera and warm up the backend connection
+    while the welcome screen is already showing.
+    """
+    for module in BACKGROUND_IMPORTS:
+        try:
+            with profiler.phase(f"import {module}"):
+                importlib.import_module(module)
+        except ImportError as e:
+            print(f"Background import of {module} failed: {e}")
+
+    # Initialize vision system, the camera session stays warm between patients
+    from vision.camera_impl import initialize_camera
+    try:
+        with profiler.phase("open camera session"):
+            app.camera = initialize_camera()
+    except Exception as e:
+        # The capture job retries initialize_camera() when the first photo is taken
+        print(f"Camera initialization failed: {e}")
+
+    # Open a keep-alive connection to the backend before the first patient
+    from network.backendClient import get_client
+    with profiler.phase("backend warm-up"):
+        get_client().warm_up()
+
+    # Resume sending scans queued while the kiosk was offline or powered down
+    with profiler.phase("start uploader"):
+        app.uploader
+
+    # Local endpoint with the rolling stage percentiles, for checking a kiosk in the field
+    if metrics_port is not None:
+        from metrics import get_metrics
+        try:
+            get_metrics().serve(metrics_port)
+        except OSError as e:
+            print(f"Metrics endpoint on port {metrics_port} failed: {e}")
+
+    profiler.mark("background init done")
+    profiler.report()
 
 def main():
-    # Initialize vision system
+    parser = argparse.ArgumentParser(description='RetinAI kiosk firmware')
+    parser.add_argument('--profile-startup', action='store_true', help='Print an import-time/phase breakdown of the boot')
+    parser.add_argument('--metrics-port', type=int, default=None, help='Serve the stage latency percentiles on this local port')
+    args = parser.parse_args()
+    profiler = StartupProfiler(enabled=args.profile_startup)
+    profiler.record("main.py imports", START_TIME, time.perf_counter())
+
+    with profiler.phase("import interface"):
+        from interface.touchscreen_ui import TouchscreenUI
+
+    # Start the GUI and paint the welcome screen before anything heavy is loaded
+    with profiler.phase("create Tk root"):
+        root = tk.Tk()
+    with profiler.phase("build welcome screen"):
+        app = TouchscreenUI(root)
+        app.start()
+    with profiler.phase("paint welcome screen"):
+        root.update()
+    profiler.mark("welcome screen visible")
+
+    # Decode the remaining screen assets and build the other screens once the UI is idle,
+    # so later transitions only have to show them
+    app.assets.preload()
+    root.after(500, app.screens.build_all)
+
     print("Initializing vision system...")
+    from network.exampleClientVariables import metrics_port
+    metrics_port = args.metrics_port if args.metrics_port is not None else metrics_port
+    init_thread = threading.Thread(target=background_init, args=(app, profiler, metrics_port), name="boot", daemon=True)
+    init_thread.start()
 
-    # Start the GUI
-    root = tk.Tk()
-    app = TouchscreenUI(root)
-    app.start()
-    root.mainloop() # Server communication called in touchscreen_ui.py
+    try:
+        root.mainloop() # Server communication called in touchscreen_ui.py
+    finally:
+        app.jobs.shutdown()
+        app.close_uploader()
+        app.transition_report()
+        if app.camera is not None:
+            app.camera.close()
+        from metrics import get_metrics
+        get_metrics().close()  # final summary of the stage percentiles
+        if "network.backendClient" in sys.modules:
+            from network.backendClient import get_client
+            get_client().close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,240 @@
+"""
+Per-stage latency metrics for the kiosk
+
+Camera, upload and UI code time their stages here, so field logs show where a
+patient's time goes: capture, encode, upload, server wait, parsing and rendering.
+
+Features:
+- Monotonic stage timers (context manager) and direct recording of measured durations
+- Per-session traces: the stage durations of one patient's scan, written once the results are shown
+- Rolling per-stage histograms (last N samples) with p50/p95/p99 kept in memory
+- JSON-lines log of session traces and periodic summaries, rotated once it reaches a size cap
+- Optional tiny HTTP endpoint: GET /metrics (stage percentiles) and GET /sessions (recent traces)
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Samples kept per stage for the rolling percentiles
+WINDOW = 512
+# Open (not yet finished) session traces kept, the oldest is dropped beyond this
+MAX_OPEN_SESSIONS = 100
+# Finished session traces kept for the /sessions endpoint
+RECENT_SESSIONS = 50
+# Size of the log before it is rotated to <path>.1 (the previous .1 is dropped), so it stays under twice this
+MAX_LOG_BYTES = 5 * 1024 * 1024
+
+def percentile(sorted_values, p):
+    """Linearly interpolated percentile (0-100) of an already sorted list, None if empty."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+class StageHistogram:
+    """Rolling window of the durations of one stage."""
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0  # every sample ever recorded, not only those in the window
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def snapshot(self):
+        """Percentiles of the window in milliseconds."""
+        values = sorted(self.samples)
+        milliseconds = lambda seconds: round(1000 * seconds, 2) if seconds is not None else None
+        return {
+            "count": self.count,
+            "window": len(values),
+            "mean_ms": milliseconds(sum(values) / len(values) if values else None),
+            "p50_ms": milliseconds(percentile(values, 50)),
+            "p95_ms": milliseconds(percentile(values, 95)),
+            "p99_ms": milliseconds(percentile(values, 99)),
+            "max_ms": milliseconds(values[-1] if values else None),
+        }
+
+class Metrics:
+    """
+    Stage timings of the kiosk.
+
+    Args:
+        path: JSON-lines file session traces and summaries are appended to, None to keep them in memory only.
+        window: Samples kept per stage for the rolling percentiles.
+        max_bytes: Size the log is rotated at.
+    """
+    def __init__(self, path=None, window=WINDOW, max_bytes=MAX_LOG_BYTES):
+        self.path = path
+        self.window = window
+        self.max_bytes = max_bytes
+        self.stages = {}  # stage name -> StageHistogram
+        self.recent = deque(maxlen=RECENT_SESSIONS)  # finished session traces
+        self._sessions = OrderedDict()  # session_id -> {stage: seconds} of sessions still running
+        self._lock = threading.Lock()
+        self._server = None
+
+    def timer(self, stage, session_id=None):
+        """
+        Time a block as a stage:
+
+            with metrics.timer("upload.encode", session.session_id):
+                ...
+        """
+        return _Timer(self, stage, session_id)
+
+    def record(self, stage, seconds, session_id=None):
+        """Add a measured duration to the stage's histogram and, if given, the session's trace."""
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = StageHistogram(self.window)
+            histogram.add(seconds)
+            if session_id is not None:
+                trace = self._sessions.get(session_id)
+                if trace is None:
+                    trace = self._sessions[session_id] = {}
+                    if len(self._sessions) > MAX_OPEN_SESSIONS:
+                        self._sessions.popitem(last=False)
+                # A stage that runs twice (a retake, a retried upload) adds up
+                trace[stage] = trace.get(stage, 0.0) + seconds
+
+    def end_session(self, session_id, **fields):
+        """
+        Close a session's trace and append it to the log.
+
+        Args:
+            fields: Extra values stored with the trace (e.g. the number of upload attempts).
+
+        Returns:
+            dict: The trace, stage durations in milliseconds.
+        """
+        with self._lock:
+            stages = self._sessions.pop(session_id, {})
+        trace = {
+            "type": "session",
+            "time": time.time(),
+            "session_id": session_id,
+            "stages_ms": {stage: round(1000 * seconds, 2) for stage, seconds in stages.items()},
+            **fields,
+        }
+        with self._lock:
+            self.recent.append(trace)
+        self._append(trace)
+        return trace
+
+    def summary(self):
+        """Rolling percentiles per stage: {stage: {count, window, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}."""
+        with self._lock:
+            return {stage: histogram.snapshot() for stage, histogram in sorted(self.stages.items())}
+
+    def dump(self):
+        """Append the current summary to the log (e.g. at shutdown)."""
+        summary = {"type": "summary", "time": time.time(), "stages": self.summary()}
+        self._append(summary)
+        return summary
+
+    def _append(self, entry):
+        if self.path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            line = json.dumps(entry) + "\n"
+            with self._lock:
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+                with open(self.path, "a") as f:
+                    f.write(line)
+        except OSError as e:
+            # Metrics must never take the kiosk down
+            print(f"Writing metrics to {self.path} failed: {e}")
+
+    def serve(self, port, host="127.0.0.1"):
+        """
+        Serve the summary on a daemon thread: GET /metrics and GET /sessions.
+
+        Returns:
+            ThreadingHTTPServer: The server (port 0 picks a free one, see server.server_port).
+        """
+        from http.server import ThreadingHTTPServer
+
+        handler = type("BoundMetricsHandler", (_handler_class(),), {"metrics": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"Metrics served on http://{host}:{self._server.server_port}/metrics")
+        return self._server
+
+    def close(self):
+        """Stop the HTTP endpoint and write a final summary."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.dump()
+
+class _Timer:
+    def __init__(self, metrics, stage, session_id):
+        self.metrics = metrics
+        self.stage = stage
+        self.session_id = session_id
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.elapsed = time.perf_counter() - self.start
+        # Failed stages are timed too, a timeout is exactly what we want to see
+        self.metrics.record(self.stage, self.elapsed, self.session_id)
+
+def _handler_class():
+    """Request handler of the endpoint, http.server is only imported when the endpoint is enabled."""
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        metrics = None  # Metrics, set by Metrics.serve()
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                body = self.metrics.summary()
+            elif self.path == "/sessions":
+                with self.metrics._lock:
+                    body = list(self.metrics.recent)
+            else:
+                self.send_error(404)
+                return
+            data = json.dumps(body, indent=2).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass  # the kiosk log is for the patient flow
+
+    return MetricsHandler
+
+# Shared metrics of the kiosk process
+_metrics = None
+_metrics_lock = threading.Lock()
+
+def get_metrics():
+    """Return the shared Metrics, logging to metrics_path (see exampleClientVariables.py)."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            from network.exampleClientVariables import metrics_path
+            _metrics = Metrics(metrics_path)
+        return _metrics
+
+def set_metrics(metrics):
+    """Replace the shared Metrics, e.g. with an in-memory one for a benchmark run."""
+    global _metrics
+    with _metrics_lock:
+        _metrics = metrics
@@ -0,0 +1,137 @@
+"""
+Backend client for the RetinAI eye_evaluation API
+
+One client (and one pooled requests.Session) is shared by the live kiosk path and
+the DemoClient, so connections to the backend are kept alive between patients.
+
+Features:
+- Pooled keep-alive connections
+- Configurable connect/read timeouts
+- Exponential-backoff retries on connection errors and idempotent requests
+- Warm-up ping of "/" at boot so the first patient doesn't pay the handshake cost
+- Upload and server-wait time of every evaluation recorded in the kiosk metrics
+"""
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from network.exampleClientVariables import kiosk_id, request_url, connect_timeout, read_timeout, max_retries, backoff_factor
+
+class BackendClient:
+    """
+    Client for the backend API built on a pooled requests.Session.
+
+    Args:
+        base_url: Base URL of the API (the EC2 instance).
+        kiosk_id: ID of this kiosk, used in the eye_evaluation route.
+        connect_timeout: Seconds to wait for a connection.
+        read_timeout: Seconds to wait for the response.
+        max_retries: Number of retries before giving up.
+        backoff_factor: Base delay of the exponential backoff between retries.
+        pool_size: Number of connections kept alive per host.
+    """
+    def __init__(self, base_url=request_url, kiosk_id=kiosk_id, connect_timeout=connect_timeout,
+                 read_timeout=read_timeout, max_retries=max_retries, backoff_factor=backoff_factor, pool_size=4):
+        self.base_url = base_url.rstrip("/")
+        self.kiosk_id = kiosk_id
+        self.timeout = (connect_timeout, read_timeout)
+
+        # Connection errors are retried for every method since the request never reached
+        # the server, read errors and 5xx responses only for idempotent methods (not POST)
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path):
+        """Join a route onto the base URL."""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path="/", **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(self.url(path), **kwargs)
+
+    def post(self, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(self.url(path), **kwargs)
+
+    def ping(self):
+        """Simple get request to check if the api is working."""
+        return self.get("/")
+
+    def evaluate(self, files, kiosk_id=None, session_id=None, **kwargs):
+        """
+        Post images to the eye_evaluation route of this kiosk.
+
+        Args:
+            files: A streamed MultipartStream body (see network/imageUpload.py), or a multipart
+                   files list in the requests ('images', (name, file, type)) format.
+            session_id: Scan session the request's timings are recorded under (see metrics.py).
+        """
+        from metrics import get_metrics
+
+        route = f"eye_evaluation/{kiosk_id or self.kiosk_id}"
+        if hasattr(files, "content_type"):
+            headers = {**kwargs.pop("headers", {}), "Content-Type": files.content_type}
+            start_time = time.perf_counter()
+            response = self.post(route, data=files, headers=headers, **kwargs)
+            received = time.perf_counter()
+            # The body records when its last byte went out: before is upload, after is the server
+            sent_at = files.sent_at if files.sent_at is not None else received
+            get_metrics().record("upload.send", sent_at - start_time, session_id)
+            get_metrics().record("upload.server_wait", received - sent_at, session_id)
+            response.upload_bytes = files.total_bytes
+            print(f"Uploaded {len(files.parts)} images, {files.total_bytes} bytes on the wire in {response.elapsed.total_seconds():.2f} seconds")
+            return response
+        with get_metrics().timer("upload.request", session_id):
+            return self.post(route, files=files, **kwargs)
+
+    def warm_up(self):
+        """
+        Open a connection to the backend ahead of the first patient. Failures are only
+        logged since the kiosk must still start when the server is unreachable.
+
+        Returns:
+            bool: True if the server responded.
+        """
+        try:
+            response = self.ping()
+            print(f"Backend warm-up: {response.status_code} in {response.elapsed.total_seconds():.2f} seconds")
+            return True
+        except requests.RequestException as e:
+            print(f"Backend warm-up failed: {e}")
+            return False
+
+    def warm_up_in_background(self):
+        """Run warm_up() on a daemon thread so it doesn't delay startup."""
+        thread = threading.Thread(target=self.warm_up, name="backend-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        self.session.close()
+
+# Shared client used by the live and demo paths
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Return the shared BackendClient, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = BackendClient()
+        return _client
@@ -0,0 +1,143 @@
+"""
+Batching evaluation client
+
+Coalesces the images of several scan sessions into one eye_evaluation request and
+hands each session back its own image_Info entries, so backlog drains and demo runs
+pay the per-request cost once per batch instead of once per patient.
+
+Features:
+- Configurable maximum batch size (sessions per request) and linger time
+- Several batches in flight at once
+- Images are sent as '<session id>__<name>' and demultiplexed back by that prefix
+- Future per session, resolved with that session's response
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+
+from metrics import get_metrics
+from network.exampleClientVariables import kiosk_id
+from network.imageUpload import build_upload, upload_name
+
+# Separator between the session ID and the image name in batched filenames
+SEPARATOR = "__"
+
+class BatchingClient:
+    """
+    Sends evaluation requests in batches.
+
+    Args:
+        client: BackendClient the batches are posted with (defaults to the shared client).
+        max_batch_size: Maximum number of sessions per request.
+        max_linger: Seconds a batch waits for more sessions after the first one arrives.
+        max_in_flight: Number of batches sent concurrently.
+        kiosk_id: Kiosk the evaluations are posted for.
+    """
+    def __init__(self, client=None, max_batch_size=8, max_linger=0.05, max_in_flight=2, kiosk_id=kiosk_id):
+        if client is None:
+            from network.backendClient import get_client
+            client = get_client()
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_linger = max_linger
+        self.kiosk_id = kiosk_id
+        self.batches = 0
+        self.sessions = 0
+        self._pending = queue.Queue()  # (session_id, items, Future), None stops a worker
+        self._workers = [
+            threading.Thread(target=self._run, name=f"batch-{i}", daemon=True) for i in range(max_in_flight)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, session_id, items):
+        """
+        Queue a session's images for the next batch.
+
+        Args:
+            session_id: ID the session's images are tagged with, must not contain '__'.
+            items: Image paths and/or Frames of the session (see build_upload).
+
+        Returns:
+            Future: Resolved with the session's response ({'image_Info': [...]} with the original
+                    image names), or a requests exception if the batch failed.
+        """
+        if SEPARATOR in session_id:
+            raise ValueError(f"Session ID must not contain '{SEPARATOR}': {session_id}")
+        future = Future()
+        self._pending.put((session_id, list(items), future))
+        return future
+
+    def evaluate(self, session_id, items):
+        """Blocking submit(): returns the session's response."""
+        return self.submit(session_id, items).result()
+
+    def _collect(self):
+        """Wait for a session, then gather more until the batch is full or the linger time is up."""
+        first = self._pending.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_linger
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is None:
+                self._pending.put(None)  # let the worker stop after this batch
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                self._send(batch)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _send(self, batch):
+        items, names = [], []
+        for session_id, session_items, _ in batch:
+            for item in session_items:
+                items.append(item)
+                names.append(f"{session_id}{SEPARATOR}{upload_name(item)}")
+
+        with get_metrics().timer("upload.encode"):
+            body = build_upload(items, crop=False, names=names)  # session captures and demo images are already cropped
+        with body:
+            response = self.client.evaluate(body, kiosk_id=self.kiosk_id)
+        self.batches += 1
+        self.sessions += len(batch)
+        if response.status_code != 200:
+            raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+
+        # Demultiplex image_Info back to each session, restoring the original image names
+        results = {session_id: [] for session_id, _, _ in batch}
+        with get_metrics().timer("upload.parse"):
+            image_info = response.json().get("image_Info", [])
+        for info in image_info:
+            session_id, _, name = info.get("name", "").partition(SEPARATOR)
+            if session_id in results:
+                results[session_id].append({**info, "name": name})
+        for session_id, _, future in batch:
+            future.set_result({"image_Info": results[session_id]})
+
+    def close(self):
+        """Send what is queued, then stop the workers."""
+        for _ in self._workers:
+            self._pending.put(None)
+        for worker in self._workers:
+            worker.join()
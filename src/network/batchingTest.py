@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PIL import Image
+from network.backendClient import BackendClient
+from network.batchingClient import BatchingClient
+from network.imageUpload import build_upload
+from network.mockServer import MockBackend, serve_in_background
+
+"""
+Batching Throughput Comparison
+
+Features:
+- Starts the local stand-in backend (200 ms per request + 20 ms per image)
+- Sends a backlog of two-image sessions one request at a time, like postRequest()
+- Sends the same backlog through the BatchingClient and checks every session got its own results
+- Prints sessions per second and request counts of both paths
+"""
+SESSIONS = 24
+MAX_BATCH_SIZE = 8
+
+def make_sessions(directory):
+    """Write a left/right image pair per session, returns (session_id, [paths]) pairs."""
+    sessions = []
+    for index in range(SESSIONS):
+        session_dir = os.path.join(directory, f"session{index}")
+        os.makedirs(session_dir)
+        paths = []
+        for side, colour in (("left", (160, 60, 30)), ("right", (150, 70, 40))):
+            path = os.path.join(session_dir, f"1_{side}.jpg")
+            Image.new("RGB", (640, 480), colour).save(path, "JPEG")
+            paths.append(path)
+        sessions.append((f"session{index}", paths))
+    return sessions
+
+def one_at_a_time(client, sessions):
+    for _, paths in sessions:
+        with build_upload(paths) as images:
+            response = client.evaluate(images)
+        assert response.status_code == 200
+
+def batched(client, sessions):
+    batching = BatchingClient(client, max_batch_size=MAX_BATCH_SIZE, max_in_flight=2)
+    futures = [(paths, batching.submit(session_id, paths)) for session_id, paths in sessions]
+    for paths, future in futures:
+        names = sorted(info["name"] for info in future.result()["image_Info"])
+        assert names == sorted(os.path.basename(path) for path in paths), names
+    batching.close()
+    return batching.batches
+
+def main():
+    backend = MockBackend(latency=0.2, per_image_latency=0.02, seed=0)
+    server, url = serve_in_background(backend)
+    client = BackendClient(base_url=url)
+
+    with tempfile.TemporaryDirectory() as directory:
+        sessions = make_sessions(directory)
+
+        start_time = time.perf_counter()
+        one_at_a_time(client, sessions)
+        single_time = time.perf_counter() - start_time
+        single_requests = backend.requests
+
+        start_time = time.perf_counter()
+        batches = batched(client, sessions)
+        batched_time = time.perf_counter() - start_time
+
+    server.shutdown()
+    client.close()
+    print(f"One at a time: {SESSIONS} sessions in {single_requests} requests, {single_time:.2f} s "
+          f"({SESSIONS / single_time:.1f} sessions/s)")
+    print(f"Batched (max {MAX_BATCH_SIZE}): {SESSIONS} sessions in {batches} requests, {batched_time:.2f} s "
+          f"({SESSIONS / batched_time:.1f} sessions/s, {single_time / batched_time:.1f}x)")
+
+if __name__ == "__main__":
+    main()
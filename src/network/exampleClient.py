@@ -1,37 +1,40 @@
 # An example of how piboard will call api
-import requests
-import time
-import os
 
 # Get Environment Variables
-from network.exampleClientVariables import kiosk_id, request_url, imagesLocation
+from metrics import get_metrics
+from network.exampleClientVariables import kiosk_id, imagesLocation
+from network.backendClient import get_client
+from network.imageUpload import build_upload
+from vision.scan_session import ScanSession
 
 def getRequest():
     # simple get response to check if api is working
-    return requests.get(f"{request_url}/")
-
-def postRequest():
-    sendTime = time.time() # get pre send time stamp
-    images = imagesToSend() # get all the images that need to be sent
-    fullURL = f"{request_url}/eye_evaluation/{kiosk_id}" # create the full URL
-    response = requests.post(fullURL, files=images)
+    return get_client().ping()
+
+def postRequest(session=None):
+    session_id = session.session_id if session is not None else None
+    with get_metrics().timer("upload.encode", session_id): # re-encoding time of the images
+        images = imagesToSend(session) # get all the images that need to be sent
+    with images:
+        # reuses the pooled keep-alive session, upload and server wait are recorded by the client
+        response = get_client().evaluate(images, kiosk_id=kiosk_id, session_id=session_id)
     return response
 
-def imagesToSend():
-    # Gets all the images that need to be sent in the post request
-    images = os.listdir(imagesLocation) # use location of current sessions images
-    files = []
-    for image in images:
-        files.append(('images', (image, open(f'{imagesLocation}/{image}', 'rb'), 'image/jpeg')))
-    return files
+def imagesToSend(session=None):
+    # Gets the images of a scan session listed in its manifest, re-encoded and streamed
+    if session is None: # default to the most recent session on disk
+        session = ScanSession.latest(imagesLocation)
+        if session is None:
+            raise FileNotFoundError(f"No scan sessions found in {imagesLocation}")
+    return build_upload(session.upload_items(), crop=False) # in-memory frames when the session is live, archived captures are already cropped
 
 
-def backendRequests(requestType):
+def backendRequests(requestType, session=None):
     # specify which request is being made
     if requestType == "get":
         return  getRequest()
     if requestType == "post":
-        return  postRequest()
+        return  postRequest(session)
 
 
 # For testing
@@ -5,4 +5,31 @@ request_url = 'http://18.224.65.5:8000/'
 # Pi images location
 imagesLocation = '/home/RetinAi/Desktop/firmware/RetinAI-Firmware/src/vision/captured_photos'
 # Windows images location
-# imagesLocation = r"C:\Users\Timothy Duchesne\Desktop\RetinAI Firmware\RetinAI-Firmware\src\vision\captured_photos"
\ No newline at end of file
+# imagesLocation = r"C:\Users\Timothy Duchesne\Desktop\RetinAI Firmware\RetinAI-Firmware\src\vision\captured_photos"
+# Pi runtime state location (upload queue, metrics log), outside the firmware checkout so kiosk runs don't dirty it
+stateLocation = '/home/RetinAi/.local/state/retinai'
+# Windows runtime state location
+# stateLocation = r"C:\Users\Timothy Duchesne\AppData\Local\RetinAI"
+# Backend HTTP client settings
+connect_timeout = 3.05  # seconds to establish the TCP/TLS connection
+read_timeout = 30  # seconds to wait for the server's response
+max_retries = 3  # retries on connection errors and idempotent request failures
+backoff_factor = 0.5  # exponential backoff between retries (0.5s, 1s, 2s, ...)
+
+# Upload settings, captures are re-encoded before upload to cut bytes on the wire
+upload_max_size = (1024, 768)  # (width, height) images are scaled down to fit, None to keep 2028x1520
+upload_quality = 85  # JPEG quality of re-encoded images
+upload_max_bytes = None  # optional per-image byte budget, lowers quality until it fits
+upload_crop_fundus = True  # crop image files to the fundus disc before re-encoding (session captures are cropped by the camera)
+
+# Store-and-forward upload queue, sessions are uploaded in the background and retried while offline
+upload_queue_path = stateLocation + '/upload_queue.db'  # SQLite database of pending evaluations
+upload_concurrency = 2  # uploads in flight at once
+upload_batch_size = 1  # queued sessions coalesced per request when draining a backlog, 1 disables batching
+upload_batch_linger = 0.05  # seconds a batch waits for more sessions
+upload_per_image = True  # one request per eye sent in parallel, each eye's result shows as soon as it arrives
+upload_pipelined = True  # upload each eye as soon as it is captured, while the next one is taken (needs upload_per_image)
+
+# Latency metrics, per-stage timings of every scan session
+metrics_path = stateLocation + '/metrics.jsonl'  # JSON-lines log of session traces and summaries (rotated at 5 MB), None to disable
+metrics_port = None  # port of the local http://127.0.0.1:<port>/metrics endpoint, None to disable
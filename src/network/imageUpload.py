@@ -0,0 +1,258 @@
+"""
+Upload stage for retinal images
+
+Captures are re-encoded to a smaller resolution/quality before upload, then sent
+as a multipart body that is streamed part by part instead of being built in memory.
+
+Features:
+- Optional crop to the fundus disc before re-encoding
+- In-memory frames are encoded straight from the capture buffer
+- JPEG re-encoding to a target resolution and quality, or a byte budget
+- Streaming multipart/form-data body with a known Content-Length
+- File handles are opened lazily and closed as soon as each part is sent
+- Bytes-on-wire reporting per request
+- Time the last byte was sent, to split upload time from server wait
+"""
+import io
+import os
+import time
+import uuid
+from PIL import Image
+
+from network.exampleClientVariables import upload_max_size, upload_quality, upload_max_bytes, upload_crop_fundus
+from vision.fundus_crop import crop_fundus
+from vision.frame_buffer import Frame
+
+# Lowest JPEG quality tried when fitting an image into the byte budget
+MIN_QUALITY = 40
+
+def reencode_image(image_path, max_size=upload_max_size, quality=upload_quality, max_bytes=upload_max_bytes, crop=upload_crop_fundus):
+    """
+    Re-encode an image as a JPEG no larger than max_size, optionally fitting it into a byte budget.
+
+    Args:
+        image_path: Path of the image to re-encode.
+        max_size: (width, height) the image is scaled down to fit, None keeps the full resolution.
+        quality: JPEG quality to encode with.
+        max_bytes: If set, the quality is lowered (down to MIN_QUALITY) until the encoded image fits in this many bytes.
+        crop: Crop the image to the fundus disc first.
+
+    Returns:
+        bytes: The encoded JPEG.
+    """
+    with Image.open(image_path) as img:
+        if crop:
+            # Crop at full resolution so the disc keeps as much detail as possible
+            img = crop_fundus(img.convert("RGB"))
+            img.thumbnail(max_size or img.size, Image.Resampling.LANCZOS)
+        elif max_size is not None:
+            # Let the JPEG decoder do most of the downscaling, then finish with a proper filter
+            img.draft("RGB", max_size)
+            img = img.convert("RGB")
+            img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        else:
+            img = img.convert("RGB")
+
+        return _fit_budget(lambda q: _encode_jpeg(img, q), quality, max_bytes)
+
+def encode_frame(frame, max_size=upload_max_size, quality=upload_quality, max_bytes=upload_max_bytes):
+    """
+    Encode an in-memory Frame for upload, without reading the capture back from disk.
+    The frame is already cropped by the camera session, and the encoding is cached on the frame.
+
+    Returns:
+        bytes: The encoded JPEG.
+    """
+    return _fit_budget(lambda q: frame.jpeg(max_size=max_size, quality=q), quality, max_bytes)
+
+def _fit_budget(encode, quality, max_bytes):
+    """Encode at quality, lowering it (binary search down to MIN_QUALITY) until the result fits in max_bytes."""
+    data = encode(quality)
+    if max_bytes is None or len(data) <= max_bytes:
+        return data
+
+    # Binary search for the highest quality that fits in the budget
+    low, high = MIN_QUALITY, quality - 1
+    best = encode(MIN_QUALITY)
+    while low <= high:
+        mid = (low + high) // 2
+        candidate = encode(mid)
+        if len(candidate) <= max_bytes:
+            best = candidate
+            low = mid + 1
+        else:
+            high = mid - 1
+    return best
+
+def _encode_jpeg(img, quality):
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+class MultipartStream:
+    """
+    A multipart/form-data body that is read part by part, so requests can stream it
+    with a Content-Length header without the whole payload being joined in memory.
+
+    Each part's content is either bytes (e.g. a re-encoded image) or a file path,
+    which is only opened while that part is being sent.
+    """
+    def __init__(self):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.parts = []  # (header bytes, content bytes or path, content length)
+        self._position = 0
+        self._part_index = 0
+        self._part_offset = 0
+        self._open_file = None
+        self.sent_at = None  # perf_counter() when the last byte was read for sending
+
+    def add_part(self, field, filename, content, content_type="image/jpeg"):
+        """
+        Add a file part to the body.
+
+        Args:
+            field: Form field name (the API expects 'images').
+            filename: Filename sent to the server.
+            content: bytes, or the path of a file to stream from disk.
+        """
+        header = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        size = len(content) if isinstance(content, bytes) else os.path.getsize(content)
+        self.parts.append((header, content, size))
+
+    def _segments(self):
+        """Sizes of every segment in the body, in order: header, content, CRLF per part, then the closing boundary."""
+        for header, _, size in self.parts:
+            yield len(header)
+            yield size
+            yield 2
+        yield len(self._closing())
+
+    def _closing(self):
+        return f"--{self.boundary}--\r\n".encode()
+
+    def __len__(self):
+        return sum(self._segments())
+
+    @property
+    def total_bytes(self):
+        """Bytes this body puts on the wire (excluding HTTP headers)."""
+        return len(self)
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(64 * 1024)
+            if not chunk:
+                return
+            yield chunk
+
+    def _segment(self, index):
+        """Return the source of body segment index (3 per part plus the closing boundary)."""
+        part, kind = divmod(index, 3)
+        if part == len(self.parts):
+            return self._closing() if kind == 0 else None
+        header, content, _ = self.parts[part]
+        if kind == 0:
+            return header
+        if kind == 1:
+            return content
+        return b"\r\n"
+
+    def read(self, size=-1):
+        """Read up to size bytes of the body (everything left if size is negative)."""
+        out = []
+        remaining = size if size is not None and size >= 0 else None
+        while remaining is None or remaining > 0:
+            source = self._segment(self._part_index)
+            if source is None:
+                if self.sent_at is None:
+                    self.sent_at = time.perf_counter()
+                break
+
+            if isinstance(source, bytes):
+                end = len(source) if remaining is None else self._part_offset + remaining
+                chunk = source[self._part_offset:end]
+                done = self._part_offset + len(chunk) >= len(source)
+            else:
+                # Stream the file from disk, keeping it open only while this part is sent
+                if self._open_file is None:
+                    self._open_file = open(source, "rb")
+                    self._open_file.seek(self._part_offset)
+                chunk = self._open_file.read(-1 if remaining is None else remaining)
+                done = not chunk or (remaining is not None and len(chunk) < remaining)
+                if done:
+                    self._open_file.close()
+                    self._open_file = None
+
+            out.append(chunk)
+            self._part_offset += len(chunk)
+            self._position += len(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+            if done:
+                self._part_index += 1
+                self._part_offset = 0
+
+        return b"".join(out)
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=0):
+        """Rewind the body (used by requests/urllib3 when retrying), optionally skipping ahead to offset."""
+        if whence != 0:
+            raise io.UnsupportedOperation("MultipartStream only supports absolute seeks")
+        self.close()
+        self.sent_at = None
+        self._position = 0
+        self._part_index = 0
+        self._part_offset = 0
+        while self._position < offset:
+            if not self.read(min(64 * 1024, offset - self._position)):
+                break
+        return self._position
+
+    def close(self):
+        if self._open_file is not None:
+            self._open_file.close()
+            self._open_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def upload_name(item):
+    """Filename an image path or in-memory Frame is uploaded under."""
+    return item.name if isinstance(item, Frame) else os.path.basename(item)
+
+def build_upload(image_paths, reencode=True, max_size=upload_max_size, quality=upload_quality, max_bytes=upload_max_bytes, crop=upload_crop_fundus, names=None):
+    """
+    Build the streamed multipart body for a set of images.
+
+    Args:
+        image_paths: Paths of the images to send, sent under their own filenames, or in-memory
+                     Frames which are encoded from memory and sent under their name.
+        reencode: Re-encode each image before upload, otherwise the files are streamed from disk as-is.
+        names: Optional filenames to send the images under instead of their own.
+
+    Returns:
+        MultipartStream: The body to post.
+    """
+    stream = MultipartStream()
+    for index, image_path in enumerate(image_paths):
+        filename = names[index] if names is not None else upload_name(image_path)
+        if isinstance(image_path, Frame):
+            stream.add_part("images", filename, encode_frame(image_path, max_size=max_size, quality=quality, max_bytes=max_bytes))
+            continue
+        if reencode:
+            content = reencode_image(image_path, max_size=max_size, quality=quality, max_bytes=max_bytes, crop=crop)
+        else:
+            content = str(image_path)
+        stream.add_part("images", filename, content)
+    return stream
@@ -0,0 +1,192 @@
+"""
+Load generator for the eye_evaluation API
+
+Simulates many kiosks posting scans at once, through the same BackendClient the
+kiosk uses, and reports the client-side latency distribution. Runs against the
+local stand-in backend by default, or any server given with --url.
+
+Features:
+- One thread and one pooled BackendClient per simulated kiosk
+- Configurable number of kiosks, requests per kiosk, images per request and think time
+- The stand-in backend's latency, jitter, error rate and inconclusive rate can be set from the command line
+- Latency percentiles (p50/p90/p95/p99), throughput and a count of every status/error
+- Optional JSON summary for comparing runs: python -m network.loadGenerator --kiosks 20 --json
+"""
+import argparse
+import io
+import json
+import threading
+import time
+from collections import Counter
+
+import requests
+from PIL import Image, ImageDraw
+
+from metrics import percentile
+from network.backendClient import BackendClient
+from network.imageUpload import MultipartStream
+from network.mockServer import MockBackend, serve_in_background
+
+# Size of the synthetic capture posted by every kiosk, the upload_max_size default
+IMAGE_SIZE = (1024, 768)
+
+def make_image(size=IMAGE_SIZE, quality=85):
+    """A synthetic fundus-like JPEG: a red disc with some noise so it doesn't compress to nothing."""
+    width, height = size
+    img = Image.effect_noise(size, 12).convert("RGB")
+    disc = Image.new("RGB", size, (170, 60, 30))
+    mask = Image.new("L", size, 0)
+    radius = min(width, height) * 2 // 5
+    ImageDraw.Draw(mask).ellipse((width // 2 - radius, height // 2 - radius, width // 2 + radius, height // 2 + radius), fill=180)
+    img.paste(disc, (0, 0), mask)
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+class LoadGenerator:
+    """
+    Posts evaluation requests from several simulated kiosks concurrently.
+
+    Args:
+        base_url: URL of the backend.
+        kiosks: Number of kiosks posting at the same time.
+        requests_per_kiosk: Evaluation requests each kiosk sends.
+        images_per_request: Images per request (2 for a left/right scan).
+        think_time: Seconds a kiosk waits between its requests (time to seat the next patient).
+        max_retries: Retries of the kiosks' clients (see BackendClient).
+    """
+    def __init__(self, base_url, kiosks=10, requests_per_kiosk=10, images_per_request=2, think_time=0.0, max_retries=0):
+        self.base_url = base_url
+        self.kiosks = kiosks
+        self.requests_per_kiosk = requests_per_kiosk
+        self.images_per_request = images_per_request
+        self.think_time = think_time
+        self.max_retries = max_retries
+        self.image = make_image()
+        self.latencies = []  # seconds of every successful request
+        self.outcomes = Counter()  # HTTP status or exception name -> count
+        self._lock = threading.Lock()
+
+    def _body(self):
+        stream = MultipartStream()
+        sides = ("left", "right")
+        for index in range(self.images_per_request):
+            stream.add_part("images", f"{index // 2 + 1}_{sides[index % 2]}.jpg", self.image)
+        return stream
+
+    def _kiosk(self, index, start_barrier):
+        kiosk_id = f"load{index:03d}"
+        client = BackendClient(base_url=self.base_url, kiosk_id=kiosk_id, max_retries=self.max_retries, pool_size=1)
+        start_barrier.wait()
+        try:
+            for _ in range(self.requests_per_kiosk):
+                body = self._body()
+                start_time = time.perf_counter()
+                try:
+                    response = client.post(f"eye_evaluation/{kiosk_id}", data=body,
+                                           headers={"Content-Type": body.content_type})
+                    if response.status_code == 200:
+                        response.json()["image_Info"]  # a malformed response counts as an error
+                    outcome = response.status_code
+                except (requests.RequestException, ValueError, KeyError) as e:
+                    outcome = type(e).__name__
+                elapsed = time.perf_counter() - start_time
+                with self._lock:
+                    self.outcomes[outcome] += 1
+                    if outcome == 200:
+                        self.latencies.append(elapsed)
+                if self.think_time:
+                    time.sleep(self.think_time)
+        finally:
+            client.close()
+
+    def run(self):
+        """
+        Run every kiosk to completion.
+
+        Returns:
+            dict: Summary with request counts, throughput and latency percentiles in milliseconds.
+        """
+        start_barrier = threading.Barrier(self.kiosks + 1)
+        threads = [threading.Thread(target=self._kiosk, args=(i, start_barrier), name=f"kiosk-{i}", daemon=True)
+                   for i in range(self.kiosks)]
+        for thread in threads:
+            thread.start()
+        start_barrier.wait()  # every kiosk has its client, start the clock
+        start_time = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - start_time
+        return self.summary(duration)
+
+    def summary(self, duration):
+        latencies = sorted(self.latencies)
+        total = sum(self.outcomes.values())
+        milliseconds = lambda seconds: round(seconds * 1000, 1) if seconds is not None else None
+        return {
+            "kiosks": self.kiosks,
+            "requests": total,
+            "succeeded": len(latencies),
+            "failed": total - len(latencies),
+            "outcomes": {str(outcome): count for outcome, count in sorted(self.outcomes.items(), key=str)},
+            "duration_s": round(duration, 3),
+            "throughput_rps": round(total / duration, 2) if duration else None,
+            "image_bytes": len(self.image),
+            "latency_ms": {
+                "min": milliseconds(latencies[0] if latencies else None),
+                "p50": milliseconds(percentile(latencies, 50)),
+                "p90": milliseconds(percentile(latencies, 90)),
+                "p95": milliseconds(percentile(latencies, 95)),
+                "p99": milliseconds(percentile(latencies, 99)),
+                "max": milliseconds(latencies[-1] if latencies else None),
+            },
+        }
+
+def print_summary(summary):
+    latency = summary["latency_ms"]
+    print(f"{summary['kiosks']} kiosks, {summary['requests']} requests in {summary['duration_s']:.2f} s "
+          f"({summary['throughput_rps']} requests/s), {summary['failed']} failed")
+    print("Outcomes: " + ", ".join(f"{outcome}: {count}" for outcome, count in summary["outcomes"].items()))
+    if summary["succeeded"]:
+        print(f"Latency (ms): min {latency['min']}, p50 {latency['p50']}, p90 {latency['p90']}, "
+              f"p95 {latency['p95']}, p99 {latency['p99']}, max {latency['max']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many kiosks posting to the eye_evaluation API")
+    parser.add_argument("--url", default=None, help="Backend to load, the local stand-in is started if not given")
+    parser.add_argument("--kiosks", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=10, help="Requests per kiosk")
+    parser.add_argument("--images", type=int, default=2, help="Images per request")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds between a kiosk's requests")
+    parser.add_argument("--max-retries", type=int, default=0, help="Client retries on connection errors")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    stand_in = parser.add_argument_group("local stand-in backend")
+    stand_in.add_argument("--latency", type=float, default=0.2, help="Seconds per request")
+    stand_in.add_argument("--per-image-latency", type=float, default=0.02, help="Extra seconds per image")
+    stand_in.add_argument("--jitter", type=float, default=0.1, help="Random extra seconds per request (uniform)")
+    stand_in.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    stand_in.add_argument("--inconclusive-rate", type=float, default=0.0, help="Fraction of images without a prediction")
+    stand_in.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        backend = MockBackend(args.latency, args.per_image_latency, args.jitter, args.error_rate,
+                              inconclusive_rate=args.inconclusive_rate, seed=args.seed)
+        server, url = serve_in_background(backend)
+
+    try:
+        summary = LoadGenerator(url, args.kiosks, args.requests, args.images, args.think_time, args.max_retries).run()
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Local stand-in for the RetinAI backend
+
+Serves "/" and "/eye_evaluation/<kiosk_id>" with the same response shape as the
+EC2 backend, so the network code can be exercised on a plain Linux box.
+
+Features:
+- Multipart image uploads parsed like the real API ('images' parts)
+- image_Info entries with name, eyeSide, prediction and selectedForDisp per image
+- Configurable latency per request and per image, with random jitter
+- Configurable error rate (5xx responses) and share of inconclusive predictions
+- Request counters per kiosk
+- Runs in-process (tests, benchmarks) or standalone: python -m network.mockServer --port 8000
+"""
+import argparse
+import email.parser
+import email.policy
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EVALUATION_ROUTE = re.compile(r"^/eye_evaluation/([^/]+)/?$")
+
+class MockBackend:
+    """
+    Behaviour of the stand-in server.
+
+    Args:
+        latency: Seconds every evaluation request takes (model load, queueing, network).
+        per_image_latency: Extra seconds per image in the request (inference).
+        jitter: Random extra latency, uniform between 0 and jitter seconds.
+        error_rate: Fraction of evaluation requests answered with error_status.
+        error_status: HTTP status of the simulated failures.
+        inconclusive_rate: Fraction of images whose prediction is None (shown as Inconclusive).
+        seed: Seed of the random latency, errors and predictions.
+    """
+    def __init__(self, latency=0.2, per_image_latency=0.02, jitter=0.0, error_rate=0.0, error_status=503,
+                 inconclusive_rate=0.0, seed=None):
+        self.latency = latency
+        self.per_image_latency = per_image_latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.inconclusive_rate = inconclusive_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.images = 0
+        self.errors = 0
+        self.requests_per_kiosk = {}
+        self._lock = threading.Lock()
+
+    def evaluate(self, kiosk_id, filenames):
+        """
+        Build the eye_evaluation response for the uploaded filenames.
+
+        Returns:
+            tuple: (HTTP status, response body dict)
+        """
+        with self._lock:
+            self.requests += 1
+            self.images += len(filenames)
+            self.requests_per_kiosk[kiosk_id] = self.requests_per_kiosk.get(kiosk_id, 0) + 1
+            failed = self.random.random() < self.error_rate
+            delay = self.latency + self.per_image_latency * len(filenames) + self.random.uniform(0, self.jitter)
+            predictions = [
+                None if self.random.random() < self.inconclusive_rate else self.random.choice(["Normal", "Glaucoma"])
+                for _ in filenames
+            ]
+            if failed:
+                self.errors += 1
+        time.sleep(delay)
+        if failed:
+            return self.error_status, {"detail": "Simulated backend failure"}
+
+        image_info = []
+        for filename, prediction in zip(filenames, predictions):
+            image_info.append({
+                "name": filename,
+                "eyeSide": "left" if "left" in filename.lower() else "right" if "right" in filename.lower() else None,
+                "prediction": prediction,
+                "selectedForDisp": True,
+            })
+        return 200, {"kiosk_id": kiosk_id, "image_Info": image_info}
+
+def parse_filenames(content_type, body):
+    """Filenames of the 'images' parts of a multipart/form-data body."""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    return [part.get_filename() for part in message.iter_parts()
+            if part.get_param("name", header="content-disposition") == "images"]
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+    backend = None  # MockBackend, set by make_server()
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/":
+            self._send_json(200, {"message": "RetinAI mock backend"})
+        else:
+            self._send_json(404, {"detail": "Not Found"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        match = EVALUATION_ROUTE.match(self.path)
+        if match is None:
+            self._send_json(404, {"detail": "Not Found"})
+            return
+        filenames = parse_filenames(self.headers.get("Content-Type", ""), body)
+        if not filenames:
+            self._send_json(422, {"detail": "No images uploaded"})
+            return
+        status, response = self.backend.evaluate(match.group(1), filenames)
+        self._send_json(status, response)
+
+    def log_message(self, format, *args):
+        pass  # one line per request would drown out benchmark output
+
+def make_server(backend=None, host="127.0.0.1", port=0):
+    """
+    Create the stand-in server (port 0 picks a free port).
+
+    Returns:
+        ThreadingHTTPServer: The server, its URL is f"http://{host}:{server.server_port}/".
+    """
+    handler = type("BoundMockHandler", (MockHandler,), {"backend": backend or MockBackend()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def serve_in_background(backend=None, host="127.0.0.1", port=0):
+    """
+    Start the stand-in server on a daemon thread.
+
+    Returns:
+        tuple: (server, base URL). Call server.shutdown() to stop it.
+    """
+    server = make_server(backend, host, port)
+    threading.Thread(target=server.serve_forever, name="mock-backend", daemon=True).start()
+    return server, f"http://{host}:{server.server_port}/"
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the RetinAI backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per request")
+    parser.add_argument("--per-image-latency", type=float, default=0.02, help="Extra seconds per image")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra seconds per request (uniform)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of the failed requests")
+    parser.add_argument("--inconclusive-rate", type=float, default=0.0, help="Fraction of images without a prediction")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    backend = MockBackend(args.latency, args.per_image_latency, args.jitter, args.error_rate,
+                          args.error_status, args.inconclusive_rate, args.seed)
+    server = make_server(backend, args.host, args.port)
+    print(f"Mock backend listening on http://{args.host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"{backend.requests} requests ({backend.errors} failed), {backend.images} images")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,491 @@
+"""
+Store-and-forward upload queue
+
+Scan sessions waiting for an evaluation are kept in an SQLite database and sent
+by a background uploader, so the kiosk keeps serving patients while the backend
+is unreachable and catches up once it is back.
+
+Features:
+- Durable queue of pending evaluations, one row per scan session (deduplicated by session ID)
+- Background uploader with bounded concurrency and exponential backoff
+- Backoff is cleared for every pending session as soon as one upload succeeds
+- Status/result lookup the UI can poll for result arrival
+- Sessions interrupted mid-upload (power loss) are retried on the next start
+- Optional batching of queued sessions into fewer requests (see batchingClient.py)
+- Optional request per image sent in parallel, each image's result is stored (and shown) as soon as it arrives
+- Images can be uploaded right after capture, before their session is submitted, and are joined by session ID
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+import requests
+
+from metrics import get_metrics
+from network.exampleClientVariables import kiosk_id, upload_queue_path, upload_concurrency, upload_per_image
+from network.imageUpload import build_upload, upload_name
+
+# Seconds before the first retry, doubled after every failure up to MAX_RETRY_DELAY
+BASE_RETRY_DELAY = 2
+MAX_RETRY_DELAY = 300
+
+# Queue states
+PENDING = "pending"
+UPLOADING = "uploading"
+DONE = "done"
+FAILED = "failed"  # rejected by the server, not retried
+
+class UploadQueue:
+    """
+    SQLite-backed queue of scan sessions to evaluate.
+
+    Args:
+        path: Database file (':memory:' for a throwaway queue).
+    """
+    def __init__(self, path=upload_queue_path):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS evaluations ("
+                " session_id TEXT PRIMARY KEY,"
+                " directory TEXT NOT NULL,"
+                " kiosk_id TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt REAL NOT NULL,"
+                " created REAL NOT NULL,"
+                " updated REAL NOT NULL,"
+                " result TEXT,"
+                " error TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS evaluations_due ON evaluations (status, next_attempt)")
+            # Results of single images of a session evaluated one request per image
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS image_results ("
+                " session_id TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " result TEXT NOT NULL,"
+                " PRIMARY KEY (session_id, name))"
+            )
+            # Uploads cut off by a restart never got their result, send them again
+            self._db.execute("UPDATE evaluations SET status = ? WHERE status = ?", (PENDING, UPLOADING))
+
+    def enqueue(self, session_id, directory, kiosk_id=kiosk_id):
+        """
+        Add a session to the queue. A session already queued is not added twice.
+
+        Returns:
+            bool: True if the session was added, False if it was already queued.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO evaluations (session_id, directory, kiosk_id, status, next_attempt, created, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session_id, directory, kiosk_id, PENDING, now, now, now),
+            )
+            return cursor.rowcount == 1
+
+    def claim(self, limit):
+        """
+        Mark up to limit due sessions as uploading and return them, oldest first.
+
+        Returns:
+            list: sqlite3.Row entries with session_id, directory, kiosk_id and attempts.
+        """
+        if limit <= 0:
+            return []
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT session_id, directory, kiosk_id, attempts FROM evaluations"
+                    " WHERE status = ? AND next_attempt <= ? ORDER BY created LIMIT ?",
+                    (PENDING, now, limit),
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE evaluations SET status = ?, updated = ? WHERE session_id = ?",
+                    [(UPLOADING, now, row["session_id"]) for row in rows],
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return rows
+
+    def complete(self, session_id, result):
+        """Store the server's result of a session."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE evaluations SET status = ?, result = ?, error = NULL, attempts = attempts + 1, updated = ?"
+                " WHERE session_id = ?",
+                (DONE, json.dumps(result), time.time(), session_id),
+            )
+
+    def add_image_result(self, session_id, name, image_info):
+        """Store the image_Info entries of one image of a session, before the whole session is done."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO image_results (session_id, name, result) VALUES (?, ?, ?)",
+                (session_id, name, json.dumps(image_info)),
+            )
+
+    def image_results(self, session_id):
+        """
+        Return the results stored per image of a session.
+
+        Returns:
+            dict: image name -> list of image_Info entries.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name, result FROM image_results WHERE session_id = ?", (session_id,)
+            ).fetchall()
+        return {row["name"]: json.loads(row["result"]) for row in rows}
+
+    def discard_image_result(self, session_id, name=None):
+        """Forget the stored result of an image (it was retaken), or of every image of the session if name is None."""
+        with self._lock:
+            if name is None:
+                self._db.execute("DELETE FROM image_results WHERE session_id = ?", (session_id,))
+            else:
+                self._db.execute("DELETE FROM image_results WHERE session_id = ? AND name = ?", (session_id, name))
+
+    def retry_later(self, session_id, error, delay):
+        """Put a session back in the queue, due again in delay seconds."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE evaluations SET status = ?, error = ?, attempts = attempts + 1, next_attempt = ?, updated = ?"
+                " WHERE session_id = ?",
+                (PENDING, str(error), now + delay, now, session_id),
+            )
+
+    def fail(self, session_id, error):
+        """Give up on a session the server rejected."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE evaluations SET status = ?, error = ?, attempts = attempts + 1, updated = ? WHERE session_id = ?",
+                (FAILED, str(error), time.time(), session_id),
+            )
+
+    def retry_all_now(self):
+        """Make every pending session due immediately (the backend is reachable again)."""
+        with self._lock:
+            self._db.execute("UPDATE evaluations SET next_attempt = ? WHERE status = ?", (time.time(), PENDING))
+
+    def status(self, session_id):
+        """
+        Return the state of a session.
+
+        Returns:
+            dict: status, attempts, error, the parsed result (None until done) and the partial result
+                  ({'image_Info': [...]} of the images evaluated so far, None if none), or None if not queued.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, attempts, error, result FROM evaluations WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        images = self.image_results(session_id)
+        return {
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "error": row["error"],
+            "result": json.loads(row["result"]) if row["result"] is not None else None,
+            "partial": {"image_Info": _merge(images)} if images else None,
+        }
+
+    def pending_ids(self):
+        """IDs of the sessions not uploaded yet, their directories must be kept."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT session_id FROM evaluations WHERE status IN (?, ?)", (PENDING, UPLOADING)
+            ).fetchall()
+        return {row["session_id"] for row in rows}
+
+    def next_due(self):
+        """Time the next pending session is due, or None if none are pending."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(next_attempt) AS due FROM evaluations WHERE status = ?", (PENDING,)
+            ).fetchone()
+        return row["due"]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class Uploader:
+    """
+    Drains an UploadQueue in the background.
+
+    Args:
+        queue: The UploadQueue to drain.
+        client: BackendClient used for the uploads (defaults to the shared client).
+        concurrency: Maximum number of uploads (or batches) in flight.
+        base_delay, max_delay: Exponential backoff between attempts of a session.
+        batching: Optional BatchingClient that coalesces queued sessions into fewer requests,
+                  it is closed with the uploader.
+        per_image: Send each image of a session as its own request, in parallel, so each result
+                   is available as soon as it arrives (not used with batching).
+    """
+    def __init__(self, queue, client=None, concurrency=upload_concurrency,
+                 base_delay=BASE_RETRY_DELAY, max_delay=MAX_RETRY_DELAY, batching=None, per_image=upload_per_image):
+        self.queue = queue
+        self._client = client
+        self.concurrency = concurrency
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.batching = batching
+        self.per_image = per_image
+        # With batching every slot can hold a whole batch of sessions
+        self.capacity = concurrency * (batching.max_batch_size if batching is not None else 1)
+        self.uploaded = 0
+        self._live = {}  # session_id -> ScanSession still in memory, uploaded without reading the SD card
+        self._early = {}  # (session_id, image name) -> Future of an image uploaded before its session was submitted
+        self._in_flight = 0
+        self._closed = False
+        self._wake = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="upload")
+        # Requests of single images, a session's upload worker waits on them
+        self._requests = ThreadPoolExecutor(max_workers=2 * concurrency, thread_name_prefix="upload-image")
+        self._dispatcher = threading.Thread(target=self._dispatch, name="upload-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from network.backendClient import get_client
+            self._client = get_client()
+        return self._client
+
+    def submit(self, session, kiosk_id=kiosk_id):
+        """
+        Queue a scan session for evaluation, a session that is already queued is not sent twice.
+
+        Returns:
+            bool: True if the session was newly queued.
+        """
+        with self._wake:
+            self._live[session.session_id] = session
+        added = self.queue.enqueue(session.session_id, session.directory, kiosk_id)
+        self.wake()
+        return added
+
+    def upload_image(self, session, item, kiosk_id=kiosk_id):
+        """
+        Start evaluating one image of a session that is still being captured, e.g. the left eye
+        while the right eye's countdown runs. When the session is submitted only the images
+        without a result are sent, an upload still in flight is waited for instead of repeated.
+        Uploading an image again (a retake) replaces the earlier one.
+
+        Returns:
+            Future: Resolved with the image's response, or None without per-image uploads.
+        """
+        if not self.per_image or self.batching is not None:
+            return None
+        key = (session.session_id, upload_name(item))
+        row = {"session_id": session.session_id, "kiosk_id": kiosk_id}
+        future = Future()
+        with self._wake:
+            self._early[key] = future
+        self.queue.discard_image_result(*key)
+        self._requests.submit(self._upload_early, row, item, key, future)
+        return future
+
+    def _upload_early(self, row, item, key, future):
+        try:
+            result = self._evaluate(row, [item])
+        except Exception as e:
+            future.set_exception(e)
+            return
+        with self._wake:
+            # A retake started while this request was in flight supersedes it
+            if self._early.get(key) is future:
+                self.queue.add_image_result(row["session_id"], key[1], result.get("image_Info", []))
+        future.set_result(result)
+
+    def discard(self, session_id):
+        """
+        Forget the early uploads of a session that will never be submitted (the patient left
+        before both eyes were taken). A session already in the queue is left alone.
+        """
+        if self.queue.status(session_id) is not None:
+            return
+        with self._wake:
+            # Uploads still in flight find their entry gone and don't store their result
+            for key in [key for key in self._early if key[0] == session_id]:
+                del self._early[key]
+        self.queue.discard_image_result(session_id)
+
+    def status(self, session_id):
+        """Poll the state of a session (see UploadQueue.status)."""
+        return self.queue.status(session_id)
+
+    def wake(self):
+        with self._wake:
+            self._wake.notify()
+
+    def _dispatch(self):
+        while True:
+            with self._wake:
+                if self._closed:
+                    return
+                free = self.capacity - self._in_flight
+            rows = self.queue.claim(free)
+            with self._wake:
+                self._in_flight += len(rows)
+            for row in rows:
+                if self.batching is not None:
+                    self._submit_batched(row)
+                else:
+                    self._executor.submit(self._upload, row)
+
+            # Sleep until the next session is due, an upload finishes or a new session is queued
+            due = self.queue.next_due()
+            timeout = 5.0 if due is None else min(5.0, max(due - time.time(), 0.05))
+            with self._wake:
+                if not self._closed:
+                    self._wake.wait(timeout)
+
+    def _load_session(self, row):
+        from vision.scan_session import ScanSession
+
+        with self._wake:
+            session = self._live.get(row["session_id"])
+        return session if session is not None else ScanSession.load(row["directory"])
+
+    def _upload(self, row):
+        try:
+            session = self._load_session(row)
+            if self.per_image:
+                result = self._upload_per_image(row, session.upload_items())
+            else:
+                result = self._evaluate(row, session.upload_items())
+        except Exception as e:
+            self._finish(row, error=e)
+        else:
+            self._finish(row, result)
+
+    def _evaluate(self, row, items):
+        """Post items in one request and return the parsed response."""
+        session_id = row["session_id"]
+        with get_metrics().timer("upload.encode", session_id):
+            images = build_upload(items, crop=False)  # captures were cropped by the camera
+        with images:
+            response = self.client.evaluate(images, kiosk_id=row["kiosk_id"], session_id=session_id)
+        if response.status_code != 200:
+            raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+        with get_metrics().timer("upload.parse", session_id):
+            return response.json()
+
+    def _upload_per_image(self, row, items):
+        """
+        Post every image not evaluated yet as its own request, in parallel, storing each
+        result as it arrives. Images already evaluated by an earlier attempt are not sent again,
+        and uploads started before the session was submitted (see upload_image) are joined.
+
+        Returns:
+            dict: The merged result of all images ({'image_Info': [...]}).
+        """
+        session_id = row["session_id"]
+        results = self.queue.image_results(session_id)
+        futures = {}
+        for item in items:
+            name = upload_name(item)
+            with self._wake:
+                early = self._early.pop((session_id, name), None)
+            if name in results:
+                continue
+            if early is None or (early.done() and early.exception() is not None):
+                # Not uploaded yet, or the early upload failed: send it now
+                early = self._requests.submit(self._evaluate, row, [item])
+            futures[early] = name
+        error = None
+        for future in as_completed(futures):
+            try:
+                image_info = future.result().get("image_Info", [])
+            except Exception as e:
+                error = error or e
+                continue
+            results[futures[future]] = image_info
+            self.queue.add_image_result(session_id, futures[future], image_info)
+        if error is not None:
+            raise error
+        return {"image_Info": _merge(results)}
+
+    def _submit_batched(self, row):
+        try:
+            session = self._load_session(row)
+        except Exception as e:
+            self._finish(row, error=e)
+            return
+
+        def done(future):
+            error = future.exception()
+            self._finish(row, None if error is not None else future.result(), error)
+
+        self.batching.submit(row["session_id"], session.upload_items()).add_done_callback(done)
+
+    def _finish(self, row, result=None, error=None):
+        """Record the outcome of a session's upload and free its slot."""
+        session_id = row["session_id"]
+        try:
+            if error is None:
+                self.queue.complete(session_id, result)
+                self.uploaded += 1
+                with self._wake:
+                    self._live.pop(session_id, None)
+                # The backend is reachable, send the backlog without waiting out its backoff
+                self.queue.retry_all_now()
+            elif isinstance(error, FileNotFoundError) or _rejected(error):
+                # The images are gone or the server refused them, retrying can't help
+                self.queue.fail(session_id, error)
+                with self._wake:
+                    self._live.pop(session_id, None)
+            else:
+                self._retry(row, error)
+        finally:
+            with self._wake:
+                self._in_flight -= 1
+                self._wake.notify()
+
+    def _retry(self, row, error):
+        delay = min(self.max_delay, self.base_delay * 2 ** row["attempts"])
+        print(f"Upload of session {row['session_id']} failed ({error}), retrying in {delay:.1f} seconds")
+        self.queue.retry_later(row["session_id"], error, delay)
+
+    def close(self):
+        """Stop dispatching, let uploads in flight finish and close the queue."""
+        with self._wake:
+            self._closed = True
+            self._wake.notify()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+        self._requests.shutdown(wait=True)
+        if self.batching is not None:
+            self.batching.close()
+        self.queue.close()
+
+def _merge(image_results):
+    """image_Info entries of the images of a session, in image name order."""
+    return [info for name in sorted(image_results) for info in image_results[name]]
+
+def _rejected(error):
+    """True for a 4xx response other than a timeout or rate limit, the request itself was refused."""
+    response = getattr(error, "response", None)
+    if not isinstance(error, requests.HTTPError) or response is None:
+        return False
+    return 400 <= response.status_code < 500 and response.status_code not in (408, 429)
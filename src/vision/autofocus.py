@@ -0,0 +1,172 @@
+"""
+Software autofocus
+
+Finds the lens position that gives the sharpest preview frame, instead of an
+operator nudging focus_absolute by hand (focus_test.py) or sweeping fixed
+LensPositions with a second of sleep at each (camera_test.py).
+
+Features:
+- Laplacian variance sharpness metric on a downscaled center ROI of preview frames
+- Coarse scan over the lens range followed by a golden-section search around the best point
+- Reports iterations and time-to-focus
+- Synthetic blurred-frame source to test the search without a camera
+"""
+import math
+import time
+import numpy as np
+
+from vision.image_metrics import to_gray, downscale, center_roi, laplacian_variance
+
+# Lens position range (Picamera2 LensPosition, dioptres)
+MIN_LENS_POSITION = 0.0
+MAX_LENS_POSITION = 10.0
+
+# Golden ratio step used to shrink the search bracket
+INV_PHI = (math.sqrt(5) - 1) / 2
+
+def focus_score(frame, roi=0.5, max_size=320):
+    """
+    Sharpness of a preview frame, computed on a downscaled center ROI.
+
+    Args:
+        frame: RGB or grayscale numpy array.
+        roi: Fraction of the frame (centered) to measure.
+        max_size: Longest side the ROI is downscaled to before measuring.
+    """
+    return laplacian_variance(downscale(center_roi(to_gray(frame), roi), max_size))
+
+class AutofocusResult:
+    """
+    Outcome of an autofocus run.
+
+    Attributes:
+        position: Lens position the lens was left at.
+        score: Sharpness score at that position.
+        iterations: Number of frames evaluated.
+        elapsed: Seconds from start to the lens being at the final position.
+    """
+    def __init__(self, position, score, iterations, elapsed):
+        self.position = position
+        self.score = score
+        self.iterations = iterations
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return (f"AutofocusResult(position={self.position:.3f}, score={self.score:.1f}, "
+                f"iterations={self.iterations}, elapsed={1000 * self.elapsed:.0f} ms)")
+
+class Autofocus:
+    """
+    Coarse-to-fine contrast autofocus.
+
+    Args:
+        set_lens_position: Callable moving the lens to a position.
+        get_frame: Callable returning a preview frame (numpy array) taken after the lens settled.
+        min_position, max_position: Lens range to search.
+        coarse_steps: Number of evenly spaced positions in the coarse scan.
+        tolerance: Stop the fine search when the bracket is narrower than this.
+        settle_frames: Frames discarded after each lens move while the lens settles.
+    """
+    def __init__(self, set_lens_position, get_frame, min_position=MIN_LENS_POSITION, max_position=MAX_LENS_POSITION,
+                 coarse_steps=6, tolerance=0.1, settle_frames=1, roi=0.5):
+        self.set_lens_position = set_lens_position
+        self.get_frame = get_frame
+        self.min_position = min_position
+        self.max_position = max_position
+        self.coarse_steps = coarse_steps
+        self.tolerance = tolerance
+        self.settle_frames = settle_frames
+        self.roi = roi
+        self._scores = {}
+
+    def _evaluate(self, position):
+        """Move the lens and score the frame, each position is only measured once per run."""
+        position = round(float(position), 4)
+        if position not in self._scores:
+            self.set_lens_position(position)
+            for _ in range(self.settle_frames):
+                self.get_frame()
+            self._scores[position] = focus_score(self.get_frame(), self.roi)
+        return self._scores[position]
+
+    def run(self):
+        """
+        Search for the sharpest lens position and leave the lens there.
+
+        Returns:
+            AutofocusResult: The chosen position, its score, iterations and time-to-focus.
+        """
+        start_time = time.monotonic()
+        self._scores = {}
+
+        # Coarse scan over the whole range
+        positions = np.linspace(self.min_position, self.max_position, self.coarse_steps)
+        scores = [self._evaluate(position) for position in positions]
+        best = int(np.argmax(scores))
+
+        # Golden-section search in the bracket around the best coarse point
+        low = positions[max(best - 1, 0)]
+        high = positions[min(best + 1, len(positions) - 1)]
+        x1 = high - INV_PHI * (high - low)
+        x2 = low + INV_PHI * (high - low)
+        f1, f2 = self._evaluate(x1), self._evaluate(x2)
+        while high - low > self.tolerance:
+            if f1 >= f2:
+                high, x2, f2 = x2, x1, f1
+                x1 = high - INV_PHI * (high - low)
+                f1 = self._evaluate(x1)
+            else:
+                low, x1, f1 = x1, x2, f2
+                x2 = low + INV_PHI * (high - low)
+                f2 = self._evaluate(x2)
+
+        # Best position seen during the whole search
+        position, score = max(self._scores.items(), key=lambda item: item[1])
+        self.set_lens_position(position)
+        result = AutofocusResult(position, score, len(self._scores), time.monotonic() - start_time)
+        print(f"Autofocus: {result}")
+        return result
+
+class SyntheticFocusSource:
+    """
+    Fake lens and preview stream for testing autofocus without a camera: frames are a
+    textured test image blurred in proportion to the distance from the in-focus position.
+
+    Args:
+        focus_position: Lens position that gives a sharp frame.
+        size: (width, height) of the preview frames.
+        blur_per_unit: Gaussian blur radius per unit of lens position away from focus.
+    """
+    def __init__(self, focus_position=4.2, size=(320, 240), blur_per_unit=2.0, seed=0):
+        from PIL import Image
+        rng = np.random.default_rng(seed)
+        width, height = size
+        # Random blobs at several scales so every blur level changes the score
+        texture = sum(
+            np.asarray(Image.fromarray(rng.integers(0, 255, (height // s, width // s), dtype=np.uint8)).resize(size), dtype=np.float32)
+            for s in (1, 4, 16)
+        ) / 3
+        self.sharp = Image.fromarray(texture.astype(np.uint8))
+        self.focus_position = focus_position
+        self.blur_per_unit = blur_per_unit
+        self.position = 0.0
+        self.frames = 0
+
+    def set_lens_position(self, position):
+        self.position = position
+
+    def get_frame(self):
+        from PIL import ImageFilter
+        self.frames += 1
+        radius = abs(self.position - self.focus_position) * self.blur_per_unit
+        return np.asarray(self.sharp.filter(ImageFilter.GaussianBlur(radius)) if radius > 0 else self.sharp)
+
+def main():
+    # Run autofocus against the synthetic source and report how it converged
+    source = SyntheticFocusSource(focus_position=4.2)
+    result = Autofocus(source.set_lens_position, source.get_frame).run()
+    print(f"True focus {source.focus_position}, found {result.position:.3f} "
+          f"({result.iterations} positions, {source.frames} frames, {1000 * result.elapsed:.0f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Burst Scoring Benchmark
+
+Run from src/: python -m vision.burst_test
+
+Features:
+- Builds a full resolution burst with blurred and eyelid-occluded frames
+- Prints the time to score the burst
+- Checks the sharp, open-eye frame is kept and exits non-zero if another one is
+"""
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageFilter
+from vision.camera_impl import CAPTURE_SIZE
+from vision.image_metrics import score_burst
+
+BURST_SIZE = 10
+SHARP_FRAME = 6
+OCCLUDED_FRAME = 5
+RUNS = 5
+
+def make_burst():
+    rng = np.random.default_rng(0)
+    width, height = CAPTURE_SIZE
+    base = Image.fromarray(rng.integers(0, 255, (height // 4, width // 4, 3), dtype=np.uint8)).resize(CAPTURE_SIZE)
+    frames = []
+    for i in range(BURST_SIZE):
+        frame = np.array(base.filter(ImageFilter.GaussianBlur(abs(i - SHARP_FRAME) * 1.5)))
+        if i == OCCLUDED_FRAME:
+            frame[:height // 3] = 230  # eyelid covering the top of the frame
+        frames.append(frame)
+    return frames
+
+def main():
+    frames = make_burst()
+    times = []
+    for _ in range(RUNS):
+        start_time = time.perf_counter()
+        scores = score_burst(frames)
+        times.append(time.perf_counter() - start_time)
+
+    print(scores)
+    print(f"Scored {BURST_SIZE} frames of {CAPTURE_SIZE[0]}x{CAPTURE_SIZE[1]}: "
+          f"best {1000 * min(times):.0f} ms, mean {1000 * sum(times) / len(times):.0f} ms")
+    if scores.best != SHARP_FRAME:
+        sys.exit(f"Kept frame {scores.best}, expected the sharp frame {SHARP_FRAME}")
+    if scores.occlusion[OCCLUDED_FRAME] <= scores.occlusion[SHARP_FRAME]:
+        sys.exit(f"Occluded frame {OCCLUDED_FRAME} not scored as occluded: {scores.occlusion.tolist()}")
+    print(f"Kept frame {scores.best} (ok)")
+
+if __name__ == "__main__":
+    main()
@@ -4,37 +4,356 @@ Camera implementation
 Features:
 - Camera initializion method
 - Capture Photo that takes in side of eye as argument and saves it
+- Long-lived camera session kept warm between patients
+- Swappable camera backends (Picamera2 on the kiosk, fake frames for headless testing)
+- Optional crop to the fundus disc before saving
+- Low resolution preview stream for autofocus and the live preview
+- Software autofocus on the preview stream
+- Burst capture that keeps the sharpest, best exposed, unoccluded frame
+- Captures kept in memory as Frames, shared by preview, upload and archive
+- Capture and crop times recorded in the kiosk metrics
+- Illuminator at full brightness only during the exposure window (see illumination.py)
+- Quality gate with automatic recapture of blurry, dark or glared frames (see quality.py)
 """
+import contextlib
 import os
+import time
+import threading
+
+from metrics import get_metrics
 
 # Directory to save the captured photos
 OUTPUT_DIR = "/home/RetinAi/Desktop/firmware/RetinAI-Firmware/src/vision/captured_photos"
 
-# Initialize Arducam using libcamera
-def initialize_camera():
-    print("Camera initialized using libcamera.")
-    # No explicit initialization is required for libcamera
-    return True
+# Camera settings previously passed on the libcamera-still command line
+CAPTURE_SIZE = (2028, 1520)
+# Low resolution stream used for autofocus and the live preview
+PREVIEW_SIZE = (640, 480)
+# Frames grabbed per eye, only the best scoring one is saved
+BURST_SIZE = 5
+# Captures per eye when the quality gate rejects a frame, the best attempt is kept after the last
+CAPTURE_ATTEMPTS = 3
+TUNING_FILE = "/usr/share/libcamera/ipa/rpi/pisp/imx477_af.json"
+
+class Picamera2Backend:
+    """
+    Camera backend built around Picamera2, configured the same way as the old
+    libcamera-still command (2028x1520 stills, imx477 AF tuning, continuous autofocus).
+    """
+    def __init__(self, size=CAPTURE_SIZE, preview_size=PREVIEW_SIZE, tuning_file=TUNING_FILE):
+        self.size = size
+        self.preview_size = preview_size
+        self.tuning_file = tuning_file
+        self.picam2 = None
+
+    def start(self):
+        """Open the sensor, load the tuning file and start the still pipeline."""
+        from picamera2 import Picamera2
+        from libcamera import controls
+
+        tuning = Picamera2.load_tuning_file(self.tuning_file) if os.path.exists(self.tuning_file) else None
+        self.picam2 = Picamera2(tuning=tuning)
+        # BGR888 gives arrays in R, G, B order, the Pi 5 ISP can output the lores stream as RGB too
+        # Extra buffers let bursts run at the sensor frame rate instead of every other frame
+        config = self.picam2.create_still_configuration(
+            main={"size": self.size, "format": "BGR888"},
+            lores={"size": self.preview_size, "format": "BGR888"},
+            buffer_count=3,
+        )
+        self.picam2.configure(config)
+        self.picam2.start()
+
+        # Keep autofocus converging while the pipeline runs so captures don't wait for it
+        self.picam2.set_controls({"AfMode": controls.AfModeEnum.Continuous})
+
+    def capture_file(self, filename):
+        """Grab the next still from the running pipeline and save it."""
+        self.picam2.capture_file(filename)
+
+    def capture_array(self):
+        """Grab the next still from the running pipeline as an RGB array."""
+        return self.picam2.capture_array("main")
+
+    def capture_preview(self):
+        """Grab the next frame of the low resolution stream as an RGB array."""
+        return self.picam2.capture_array("lores")
+
+    def set_controls(self, camera_controls):
+        self.picam2.set_controls(camera_controls)
+
+    def set_lens_position(self, position):
+        from libcamera import controls
+        self.picam2.set_controls({"AfMode": controls.AfModeEnum.Manual, "LensPosition": position})
+
+    def stop(self):
+        if self.picam2 is not None:
+            self.picam2.stop()
+            self.picam2.close()
+            self.picam2 = None
+
+class FakeBackend:
+    """
+    Camera backend that serves frames from a frame source instead of the sensor,
+    so the capture path can run on a headless Linux box.
+
+    Args:
+        frame_source: Callable returning an RGB numpy array (H, W, 3) per call.
+                      Defaults to a mid-grey frame of CAPTURE_SIZE.
+    """
+    def __init__(self, frame_source=None, size=CAPTURE_SIZE, preview_size=PREVIEW_SIZE):
+        self.size = size
+        self.preview_size = preview_size
+        self.frame_source = frame_source or self._grey_frame
+        self.controls = {}
+        self.started = False
+        self.frames_captured = 0
+
+    def _grey_frame(self):
+        import numpy as np
+        width, height = self.size
+        return np.full((height, width, 3), 128, dtype=np.uint8)
+
+    def start(self):
+        self.started = True
+
+    def capture_file(self, filename):
+        from PIL import Image
+        Image.fromarray(self.capture_array()).save(filename, "JPEG")
+
+    def capture_array(self):
+        if not self.started:
+            raise RuntimeError("Camera backend has not been started")
+        self.frames_captured += 1
+        return self.frame_source()
+
+    def capture_preview(self):
+        import numpy as np
+        from PIL import Image
+        frame = Image.fromarray(self.capture_array())
+        factor = max(1, min(frame.width // self.preview_size[0], frame.height // self.preview_size[1]))
+        return np.asarray(frame.reduce(factor).resize(self.preview_size))
+
+    def set_controls(self, camera_controls):
+        self.controls.update(camera_controls)
+
+    def set_lens_position(self, position):
+        self.set_controls({"AfMode": "Manual", "LensPosition": position})
+
+    def stop(self):
+        self.started = False
+
+class CameraSession:
+    """
+    A camera session that is opened once at startup and kept warm between patients,
+    so each capture only grabs a still from the already running pipeline.
+
+    Args:
+        backend: Camera backend to use (defaults to Picamera2Backend).
+        output_dir: Directory to save the captured photos.
+        crop_fundus: Crop each capture to the fundus disc before saving it.
+        burst_size: Frames grabbed per capture, the best scoring one is saved (1 disables bursts).
+        illumination: Optional IlluminationController pulsed to full brightness for each capture and autofocus run.
+        quality_gate: Optional QualityGate, rejected frames are recaptured up to capture_attempts times.
+        capture_attempts: Captures per eye when the quality gate rejects a frame.
+    """
+    def __init__(self, backend=None, output_dir=OUTPUT_DIR, crop_fundus=True, burst_size=BURST_SIZE, illumination=None,
+                 quality_gate=None, capture_attempts=CAPTURE_ATTEMPTS):
+        self.backend = backend if backend is not None else Picamera2Backend()
+        self.output_dir = output_dir
+        self.crop_fundus = crop_fundus
+        self.burst_size = burst_size
+        self.illumination = illumination
+        self.quality_gate = quality_gate
+        self.capture_attempts = capture_attempts
+        self.last_burst = None  # BurstScores of the latest burst
+        self.is_open = False
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Start the camera pipeline if it isn't already running."""
+        with self._lock:
+            if not self.is_open:
+                start_time = time.monotonic()
+                self.backend.start()
+                self.is_open = True
+                print(f"Camera session opened in {time.monotonic() - start_time:.2f} seconds.")
+        return self
+
+    def capture_frame(self, side, stats=None, progress=None):
+        """
+        Capture a frame of the left/right eye from the running pipeline and keep it in memory.
+        With a quality gate, rejected frames are recaptured and the frame's quality report is attached.
+
+        Args:
+            side: "left" or "right".
+            stats: FrameStats the frame's copies and writes are counted in.
+            progress: Optional callable given a status message when a frame is retaken.
+
+        Returns:
+            Frame: The (cropped) frame, named like the file it is archived as. If every attempt was
+                   rejected it is the best one, check frame.quality.passed.
+        """
+        if side.lower() not in ["left", "right"]:
+            raise ValueError("Invalid input. Please choose 'left' or 'right'.")
+
+        if not self.is_open:
+            self.open()
+
+        if self.quality_gate is None:
+            return self._capture_once(side, stats)
+
+        best = None
+        for attempt in range(1, self.capture_attempts + 1):
+            frame = self._capture_once(side, stats)
+            with get_metrics().timer("camera.quality"):
+                frame.quality = self.quality_gate.assess(frame.array)
+            if frame.quality.passed:
+                return frame
+            print(f"{side.capitalize()} frame rejected ({', '.join(frame.quality.failures)}), "
+                  f"attempt {attempt} of {self.capture_attempts}")
+            if best is None or frame.quality.score > best.quality.score:
+                best = frame
+            if attempt < self.capture_attempts and progress is not None:
+                progress(f"Image {frame.quality.failures[0]}, retaking...")
+        return best
+
+    def _capture_once(self, side, stats):
+        from vision.frame_buffer import Frame
+
+        metrics = get_metrics()
+        start_time = time.monotonic()
+        with metrics.timer("camera.capture"):
+            if self.burst_size > 1:
+                # The burst pulses the light for the grab only, it is dimmed again while the frames are scored
+                array = self.capture_burst(self.burst_size)
+            else:
+                with self._exposure(), self._lock:
+                    array = self.backend.capture_array()
+        frame = Frame(array, f"1_{side.lower()}.jpg", stats)
+
+        if self.crop_fundus:
+            # Crop outside the lock so the pipeline is free for the next capture, a view of the same pixels
+            from vision.fundus_crop import find_fundus_box
+            with metrics.timer("camera.crop"):
+                box = find_fundus_box(frame.array)
+            if box is None:
+                print("No fundus border to crop, keeping the full frame")
+            else:
+                frame = frame.crop(box)
+
+        print(f"{side.capitalize()} retinal frame captured ({time.monotonic() - start_time:.2f} seconds)")
+        return frame
+
+    def capture(self, side):
+        """
+        Capture a photo of the left/right eye from the running pipeline and save it.
+
+        Args:
+            side: "left" or "right".
+
+        Returns:
+            str: Path of the saved photo.
+        """
+        filename = self.capture_frame(side).write(self.output_dir)
+        print(f"{side.capitalize()} retinal image saved as {filename}")
+        return filename
+
+    def capture_burst(self, count=BURST_SIZE):
+        """
+        Grab count consecutive frames and keep the best one, so a blink or saccade
+        during the capture doesn't force the whole eye to be redone.
+
+        Returns:
+            numpy.ndarray: The best scoring RGB frame (scores are kept in last_burst).
+        """
+        from vision.image_metrics import score_burst
+
+        if not self.is_open:
+            self.open()
+        with self._exposure(), self._lock:
+            frames = [self.backend.capture_array() for _ in range(count)]
+
+        start_time = time.monotonic()
+        self.last_burst = score_burst(frames)
+        print(f"Burst of {count} frames scored in {1000 * (time.monotonic() - start_time):.0f} ms, "
+              f"kept frame {self.last_burst.best}")
+        return frames[self.last_burst.best]
+
+    def capture_preview(self):
+        """
+        Grab the next low resolution preview frame (RGB array), waits while a still or burst is being captured.
+        """
+        if not self.is_open:
+            self.open()
+        with self._lock:
+            return self.backend.capture_preview()
+
+    def autofocus(self, **kwargs):
+        """
+        Focus the lens with the software autofocus on the preview stream (switches AF to manual).
+
+        Returns:
+            AutofocusResult: The chosen lens position, iterations and time-to-focus.
+        """
+        from vision.autofocus import Autofocus
+
+        if not self.is_open:
+            self.open()
+        # Focus under the same light as the capture
+        with self._exposure(), self._lock:
+            return Autofocus(self.backend.set_lens_position, self.backend.capture_preview, **kwargs).run()
+
+    def _exposure(self):
+        """Pulse the illuminator to full brightness, or do nothing without one."""
+        if self.illumination is None:
+            return contextlib.nullcontext()
+        return self.illumination.pulse()
+
+    def close(self):
+        """Stop the camera pipeline and turn the light off."""
+        with self._lock:
+            if self.is_open:
+                self.backend.stop()
+                self.is_open = False
+        if self.illumination is not None:
+            self.illumination.report()
+            self.illumination.close()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# Shared session used by capture_photo()
+_session = None
+# The boot thread and the first capture job may both initialize the camera, only one may open the hardware
+_session_lock = threading.Lock()
+
+# Initialize Arducam and keep the session warm
+def initialize_camera(backend=None):
+    global _session
+    with _session_lock:
+        if _session is None:
+            # The kiosk drives its illuminator, a fake backend runs without one
+            illumination = None
+            quality_gate = None
+            if backend is None:
+                from vision.illumination import open_illumination
+                from vision.quality import QualityGate
+                illumination = open_illumination()
+                quality_gate = QualityGate()
+            _session = CameraSession(backend, illumination=illumination, quality_gate=quality_gate)
+        session = _session
+    session.open()
+    print("Camera initialized using Picamera2.")
+    return session
 
 # Capture photo of left/right eye and save it
 def capture_photo(side):
     if side.lower() not in ["left", "right"]:
         print("Invalid input. Please choose 'left' or 'right'.")
         return
-    
-    # Ensure output directory exists
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
-    # Filename based on the side of the eye
-    filename = f"{OUTPUT_DIR}/1_{side.lower()}.jpg"
-    
-    # Command to capture a photo using libcamera-still
-    camera_cmd = (
-        f"libcamera-still -o {filename} "
-        "--width 2028 --height 1520 "
-        "--tuning-file /usr/share/libcamera/ipa/rpi/pisp/imx477_af.json "
-        "--autofocus-mode continuous "
-    )
-    
-    os.system(camera_cmd)
-    print(f"{side.capitalize()} retinal image saved as {filename}")
+
+    session = _session if _session is not None else initialize_camera()
+    return session.capture(side)
@@ -1,18 +1,57 @@
 # api_client.py
-import requests
 import os
-import pandas as pd
+import csv
+import threading
+from network.backendClient import BackendClient, get_client
+from network.imageUpload import build_upload
 
 class DemoClient:
-    def __init__(self, kiosk_id='A1', request_url='http://18.224.65.5:8000/', images_dir='testImages', csv_dir='csv'):
+    def __init__(self, kiosk_id='A1', request_url='http://18.224.65.5:8000/', images_dir='testImages', csv_dir='csv', client=None):
         """
         Initialize the ApiClient with kiosk_id, API endpoint URL, and images directory.
+        The shared BackendClient is reused when it points at the same API endpoint.
         """
         self.kiosk_id = kiosk_id
         self.request_url = request_url
         self.images_dir = images_dir
         self.csv_dir = csv_dir
 
+        if client is None:
+            client = get_client()
+            if client.base_url != request_url.rstrip("/"):
+                client = BackendClient(base_url=request_url, kiosk_id=kiosk_id)
+        self.client = client
+
+        # Ground-truth labels indexed by image filename, reloaded when the CSV changes
+        self._labels = {}
+        self._labels_mtime = None
+        self._labels_lock = threading.Lock()
+        try:
+            self._load_labels()
+        except FileNotFoundError:
+            pass  # reported when images are sent, same as before
+
+    def _load_labels(self):
+        """
+        Load the true labels CSV into a filename -> label dict if it changed since the last load.
+        """
+        with self._labels_lock:
+            try:
+                mtime = os.path.getmtime(self.csv_dir)
+            except OSError:
+                raise FileNotFoundError(f"CSV file not found: {self.csv_dir}")
+            if mtime == self._labels_mtime:
+                return self._labels
+
+            labels = {}
+            with open(self.csv_dir, newline='') as csv_file:
+                for row in csv.DictReader(csv_file):
+                    label = row['types']
+                    labels.setdefault(row['fundus'], int(label) if label.lstrip('-').isdigit() else label)
+            self._labels = labels
+            self._labels_mtime = mtime
+            return labels
+
     def send_images_and_get_diagnosis(self, image_filenames):
         """
         Send selected images to the API, get the diagnosis, and compare with true labels.
@@ -23,44 +62,70 @@ class DemoClient:
         Returns:
             list of dict: A list of dictionaries containing the diagnosis and whether it matches the true label.
         """
+        # Send the POST request with the re-encoded images streamed as the body
+        with build_upload(self._image_paths(image_filenames), crop=False) as files:  # dataset images are already cropped
+            response = self.client.evaluate(files, kiosk_id=self.kiosk_id)
+
+        if response.status_code != 200:
+            raise Exception(f"API request failed with status code: {response.status_code}")
+
+        # Get the diagnosis from the API response
+        return self._compare_with_labels(image_filenames, response.json())
+
+    def send_selections_batched(self, selections, batching):
+        """
+        Send several selections of images through a BatchingClient, so a validation run
+        needs fewer requests than one send_images_and_get_diagnosis() call per selection.
+
+        Args:
+            selections (list of list of str): Image filenames of each selection.
+            batching (BatchingClient): Client the selections are coalesced by.
+
+        Returns:
+            list of list of dict: The results of each selection, as from send_images_and_get_diagnosis().
+        """
+        futures = [
+            batching.submit(f"selection{index}", self._image_paths(image_filenames))
+            for index, image_filenames in enumerate(selections)
+        ]
+        return [self._compare_with_labels(image_filenames, future.result())
+                for image_filenames, future in zip(selections, futures)]
+
+    def _image_paths(self, image_filenames):
+        """Paths of the images to send, checking they exist."""
         if not image_filenames:
             raise ValueError("At least one image must be provided.")
 
-        # Prepare the images for the POST request
-        files = []
+        image_paths = []
         for image_filename in image_filenames:
             image_path = os.path.join(self.images_dir, image_filename)
             if not os.path.exists(image_path):
                 raise FileNotFoundError(f"Image file not found: {image_path}")
-            files.append(('images', (image_filename, open(image_path, 'rb'), 'image/jpeg')))
+            image_paths.append(image_path)
+        return image_paths
 
-        # Send the POST request
-        full_url = f"{self.request_url}/eye_evaluation/{self.kiosk_id}"
-        response = requests.post(full_url, files=files)
-
-        if response.status_code != 200:
-            raise Exception(f"API request failed with status code: {response.status_code}")
-
-        # Get the diagnosis from the API response
-        diagnosis = response.json()
+    def _compare_with_labels(self, image_filenames, diagnosis):
+        """
+        Compare the API's diagnosis of each image with its true label.
+        """
+        # True labels, only re-read if the CSV file changed
+        labels = self._load_labels()
 
-        # Load the true labels from the CSV file
-        try:
-            test_df = pd.read_csv(self.csv_dir)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"CSV file not found: {self.csv_dir}")
+        # Diagnoses from the image_Info list, keyed by image name
+        image_infos = {}
+        for info in diagnosis['image_Info']:
+            image_infos.setdefault(info['name'], info)
 
         # Compare each image's diagnosis with the true label
         results = []
         for image_filename in image_filenames:
             # Get the true label for the image
-            true_label = test_df.loc[test_df['fundus'] == image_filename, 'types'].values
-            if len(true_label) == 0:
+            true_label = labels.get(image_filename)
+            if true_label is None:
                 raise ValueError(f"True label not found for image: {image_filename}")
-            true_label = true_label[0]
 
-            # Get the diagnosis for the image from the image_Info list
-            image_info = next((info for info in diagnosis['image_Info'] if info['name'] == image_filename), None)
+            # Get the diagnosis for the image
+            image_info = image_infos.get(image_filename)
             if image_info is None:
                 raise ValueError(f"Diagnosis not found for image: {image_filename}")
 
@@ -1,3 +1,7 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # allow network imports
+
 from demo_diagnoses import DemoClient
 import time  # Import the time module
 
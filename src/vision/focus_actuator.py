@@ -0,0 +1,170 @@
+"""
+Focus actuator
+
+Drives the lens focus motor through the V4L2 sub-device directly, instead of
+forking `v4l2-ctl` for every focus step.
+
+Features:
+- Keeps the sub-device file descriptor open and issues VIDIOC_S_CTRL ioctls
+- Worker thread that coalesces queued targets, only the latest one is applied
+- Asynchronous move_to() returning a Future resolved with the applied position
+- Fake device backend for testing without the camera hardware
+"""
+import os
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+# Sub-device of the Arducam focus motor
+FOCUS_DEVICE = "/dev/v4l-subdev0"
+
+# From linux/videodev2.h: VIDIOC_S_CTRL = _IOWR('V', 28, struct v4l2_control)
+VIDIOC_S_CTRL = 0xC008561C
+V4L2_CID_FOCUS_ABSOLUTE = 0x009A090A
+V4L2_CONTROL = struct.Struct("Ii")  # struct v4l2_control { __u32 id; __s32 value; }
+
+# Range of focus_absolute on the imx477 motor
+MIN_FOCUS = 0
+MAX_FOCUS = 1000
+
+class V4L2FocusDevice:
+    """
+    Focus motor behind a V4L2 sub-device, the device node stays open between moves.
+
+    Args:
+        path: Sub-device node of the focus motor.
+        control_id: V4L2 control written on each move.
+    """
+    def __init__(self, path=FOCUS_DEVICE, control_id=V4L2_CID_FOCUS_ABSOLUTE):
+        self.path = path
+        self.control_id = control_id
+        self.fd = os.open(path, os.O_RDWR)
+
+    def set_focus(self, value):
+        """
+        Write the focus control.
+
+        Raises:
+            OSError: If the driver rejects the ioctl.
+        """
+        import fcntl
+        fcntl.ioctl(self.fd, VIDIOC_S_CTRL, V4L2_CONTROL.pack(self.control_id, int(value)))
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+class FakeFocusDevice:
+    """
+    Stand-in focus device for testing, records every value written.
+
+    Args:
+        move_time: Seconds each write blocks for, to mimic the motor/I2C latency.
+        fail: If true every write raises OSError.
+    """
+    def __init__(self, move_time=0.0, fail=False):
+        self.move_time = move_time
+        self.fail = fail
+        self.writes = []
+        self.closed = False
+
+    def set_focus(self, value):
+        if self.move_time:
+            time.sleep(self.move_time)
+        if self.fail:
+            raise OSError("fake focus device failure")
+        self.writes.append(value)
+
+    def close(self):
+        self.closed = True
+
+class FocusActuator:
+    """
+    Moves the focus motor on a worker thread. Targets queued while a move is in
+    progress are coalesced, only the most recent one is written to the device.
+
+    Args:
+        device: Focus device backend (V4L2FocusDevice, FakeFocusDevice). Defaults to the sub-device node.
+        min_focus, max_focus: Targets are clamped to this range.
+        initial: Position the motor is assumed to be at, writes equal to it are skipped.
+    """
+    def __init__(self, device=None, min_focus=MIN_FOCUS, max_focus=MAX_FOCUS, initial=None):
+        self.device = device if device is not None else V4L2FocusDevice()
+        self.min_focus = min_focus
+        self.max_focus = max_focus
+        self.position = initial
+        self.moves = 0  # device writes
+        self.coalesced = 0  # targets replaced before they were written
+        self._target = None
+        self._waiters = []  # futures of the pending target and the ones it replaced
+        self._closed = False
+        self._condition = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="focus-actuator", daemon=True)
+        self._worker.start()
+
+    def clamp(self, position):
+        return max(self.min_focus, min(int(position), self.max_focus))
+
+    def move_to(self, position):
+        """
+        Queue a move to position, replacing any target not yet written.
+
+        Returns:
+            Future: Resolved with the position actually applied (the latest target), or with
+                    the exception raised by the device.
+        """
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Focus actuator is closed")
+            if self._target is not None:
+                self.coalesced += 1
+            self._target = self.clamp(position)
+            self._waiters.append(future)
+            self._condition.notify()
+        return future
+
+    def move_by(self, step):
+        """Queue a move relative to the latest target (or the current position)."""
+        with self._condition:
+            base = self._target if self._target is not None else self.position
+        return self.move_to((base if base is not None else self.min_focus) + step)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._target is None and not self._closed:
+                    self._condition.wait()
+                if self._target is None:
+                    return
+                target, waiters = self._target, self._waiters
+                self._target, self._waiters = None, []
+
+            try:
+                if target != self.position:
+                    self.device.set_focus(target)
+                    self.position = target
+                    self.moves += 1
+            except Exception as e:  # any failure is handed to the callers, the worker keeps serving moves
+                print(f"Focus adjustment failed! Check v4l2 interface ({e})")
+                for future in waiters:
+                    future.set_exception(e)
+            else:
+                for future in waiters:
+                    future.set_result(target)
+
+    def close(self):
+        """Apply any pending target, stop the worker and close the device."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join()
+        self.device.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -3,6 +3,8 @@ import threading
 import pygame
 from pygame.locals import *
 
+from focus_actuator import FocusActuator
+
 # Initialize Pygame
 pygame.init()
 screen = pygame.display.set_mode((320, 240), 0, 32)
@@ -14,32 +16,27 @@ MAX_FOCUS = 1000
 INITIAL_FOCUS = 500
 STEP_SIZE = 10
 
-# Thread-safe focus control
-focus_lock = threading.Lock()
-current_focus = INITIAL_FOCUS
+# Keeps /dev/v4l-subdev0 open, key-repeat steps queued during a move are coalesced
+actuator = FocusActuator(min_focus=MIN_FOCUS, max_focus=MAX_FOCUS)
+
+def report_focus(future):
+    if future.exception() is None:
+        print(f"Focus set to: {future.result()}")
 
 def set_focus(value):
-    """Set focus using v4l2-ctl with proper error handling"""
-    global current_focus
-    with focus_lock:
-        clamped = max(MIN_FOCUS, min(value, MAX_FOCUS))
-        if clamped != current_focus:
-            ret = os.system(f"v4l2-ctl -d /dev/v4l-subdev0 -c focus_absolute={clamped}")
-            if ret == 0:
-                current_focus = clamped
-                print(f"Focus set to: {current_focus}")
-            else:
-                print("Focus adjustment failed! Check v4l2 interface")
+    """Queue a focus move, returns without waiting for the motor"""
+    actuator.move_to(value).add_done_callback(report_focus)
 
 def run_focus_control():
     while True:
         for event in pygame.event.get():
             if event.type == KEYDOWN:
                 if event.key == K_UP:
-                    set_focus(current_focus + STEP_SIZE)
+                    actuator.move_by(STEP_SIZE).add_done_callback(report_focus)
                 elif event.key == K_DOWN:
-                    set_focus(current_focus - STEP_SIZE)
+                    actuator.move_by(-STEP_SIZE).add_done_callback(report_focus)
                 elif event.key == K_q:
+                    actuator.close()
                     pygame.quit()
                     os._exit(0)
 
@@ -0,0 +1,220 @@
+"""
+Frame buffer
+
+Captured frames are kept in memory and shared by the on-screen preview, the
+upload encoder and the archive writer, instead of every stage re-reading and
+re-decoding the JPEG from the SD card.
+
+Features:
+- Frame wrapping the camera's NumPy array (read-only, crops are views where possible)
+- Cached PIL image, previews and JPEG encodings per frame
+- Archive writer that puts each frame on the SD card once, atomically
+- Per-session counters of bytes copied, encodes and SD writes
+"""
+import io
+import os
+import threading
+import numpy as np
+from PIL import Image
+
+class FrameStats:
+    """
+    Counters of the work done on the frames of one session.
+
+    Attributes:
+        bytes_copied: Bytes of frame data copied (array -> PIL, padded crops).
+        encodes: JPEG encodes.
+        sd_writes: Files written to the SD card.
+        sd_bytes: Bytes written to the SD card.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.bytes_copied = 0
+            self.encodes = 0
+            self.sd_writes = 0
+            self.sd_bytes = 0
+
+    def add(self, bytes_copied=0, encodes=0, sd_writes=0, sd_bytes=0):
+        with self._lock:
+            self.bytes_copied += bytes_copied
+            self.encodes += encodes
+            self.sd_writes += sd_writes
+            self.sd_bytes += sd_bytes
+
+    def report(self):
+        """
+        Print and return the counters.
+
+        Returns:
+            dict: bytes_copied, encodes, sd_writes and sd_bytes.
+        """
+        with self._lock:
+            report = {
+                "bytes_copied": self.bytes_copied,
+                "encodes": self.encodes,
+                "sd_writes": self.sd_writes,
+                "sd_bytes": self.sd_bytes,
+            }
+        print(f"Frames: {report['bytes_copied'] / 1e6:.1f} MB copied, {report['encodes']} JPEG encodes, "
+              f"{report['sd_writes']} SD writes ({report['sd_bytes'] / 1e6:.2f} MB)")
+        return report
+
+class Frame:
+    """
+    A captured frame held in memory.
+
+    Args:
+        array: RGB (H, W, 3) uint8 array from the camera, used without copying.
+        name: Filename the frame is archived and uploaded under (e.g. '1_left.jpg').
+        stats: FrameStats the frame's copies, encodes and writes are counted in.
+    """
+    def __init__(self, array, name, stats=None):
+        self.array = np.asarray(array)
+        self.array.flags.writeable = False  # shared between stages, nobody may modify it
+        self.name = name
+        self.stats = stats if stats is not None else FrameStats()
+        self.path = None  # set once the frame has been archived
+        self.quality = None  # QualityReport set by the capture quality gate
+        self._image = None
+        self._previews = {}  # size -> PIL image
+        self._jpegs = {}  # (max_size, quality) -> bytes
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        """(width, height) of the frame."""
+        return self.array.shape[1], self.array.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.array.nbytes
+
+    def memoryview(self):
+        """Read-only view of the frame's pixels."""
+        return memoryview(self.array)
+
+    def crop(self, box):
+        """
+        Crop the frame to box (left, top, right, bottom).
+
+        A box inside the frame is a view of the same pixels, a box reaching past the
+        edges is padded with black (like PIL's crop) which needs a copy.
+
+        Returns:
+            Frame: The cropped frame, sharing the name and stats.
+        """
+        left, top, right, bottom = box
+        width, height = self.size
+        if left >= 0 and top >= 0 and right <= width and bottom <= height:
+            return Frame(self.array[top:bottom, left:right], self.name, self.stats)
+
+        padded = np.zeros((bottom - top, right - left) + self.array.shape[2:], dtype=self.array.dtype)
+        src_left, src_top = max(left, 0), max(top, 0)
+        src_right, src_bottom = min(right, width), min(bottom, height)
+        padded[src_top - top:src_bottom - top, src_left - left:src_right - left] = \
+            self.array[src_top:src_bottom, src_left:src_right]
+        self.stats.add(bytes_copied=padded.nbytes)
+        return Frame(padded, self.name, self.stats)
+
+    def image(self):
+        """
+        The frame as a PIL image, converted once and shared (treat it as read-only).
+        """
+        with self._lock:
+            if self._image is None:
+                # PIL keeps its own copy of RGB pixel data
+                self._image = Image.fromarray(np.ascontiguousarray(self.array))
+                self.stats.add(bytes_copied=self.nbytes)
+            return self._image
+
+    def preview(self, size):
+        """
+        The frame resized to size for display, cached per size.
+        """
+        with self._lock:
+            preview = self._previews.get(size)
+        if preview is None:
+            img = self.image()
+            # Box-average most of the way down first, it is much cheaper than a resampling filter
+            factor = max(1, min(img.width // size[0], img.height // size[1]))
+            preview = (img.reduce(factor) if factor > 1 else img).resize(size, Image.Resampling.LANCZOS)
+            with self._lock:
+                preview = self._previews.setdefault(size, preview)
+        return preview
+
+    def jpeg(self, max_size=None, quality=95):
+        """
+        The frame encoded as a JPEG, scaled down to fit max_size, cached per settings.
+
+        Returns:
+            bytes: The encoded JPEG.
+        """
+        key = (max_size, quality)
+        with self._lock:
+            data = self._jpegs.get(key)
+        if data is None:
+            img = self.image()
+            if max_size is not None and (img.width > max_size[0] or img.height > max_size[1]):
+                img = img.copy()
+                img.thumbnail(max_size, Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            img.save(buffer, "JPEG", quality=quality, optimize=True)
+            data = buffer.getvalue()
+            self.stats.add(encodes=1)
+            with self._lock:
+                data = self._jpegs.setdefault(key, data)
+        return data
+
+    def write(self, directory, quality=95):
+        """
+        Archive the frame to directory/name, written once via a temporary file and
+        an atomic rename so a crash never leaves a truncated JPEG.
+
+        Returns:
+            str: Path of the archived file.
+        """
+        data = self.jpeg(quality=quality)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.stats.add(sd_writes=1, sd_bytes=len(data))
+        self.path = path
+        return path
+
+class FrameStore:
+    """
+    The frames of the current scan session, keyed by name, with shared stats.
+    """
+    def __init__(self):
+        self.stats = FrameStats()
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def put(self, frame):
+        frame.stats = self.stats
+        with self._lock:
+            self._frames[frame.name] = frame
+        return frame
+
+    def get(self, name):
+        """Return the frame stored under name, or None."""
+        with self._lock:
+            return self._frames.get(name)
+
+    def frames(self):
+        """Frames of the session, sorted by name like the files in the capture directory."""
+        with self._lock:
+            return [self._frames[name] for name in sorted(self._frames)]
+
+    def clear(self):
+        """Start a new session, dropping the frames and resetting the stats."""
+        with self._lock:
+            self._frames.clear()
+        self.stats.reset()
@@ -0,0 +1,126 @@
+"""
+Fundus Crop Check and Benchmark
+
+Run from src/: python -m vision.fundus_crop_test [images_dir]
+
+Features:
+- Checks the crop box of a synthetic fundus disc (centred square around the disc, also when the
+  frame clips the disc), that cropping a cropped image again leaves it unchanged, and that the
+  repo's sample captures (already cropped, the fundus fills the frame) are left unchanged
+- Exits non-zero if a box is not the expected one
+- Crops every image in the raspi_raw sample set used by DemoClient, if it is available, and prints
+  the average crop time and the JPEG size before and after cropping
+"""
+import io
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+from vision.fundus_crop import MARGIN, crop_fundus, find_fundus_box
+
+# Sample set used by DemoClient (PiOS)
+images_dir = '/home/RetinAi/Desktop/Embedded/raspi_raw'
+# Sample set used by DemoClient (Windows)
+# images_dir = '../../Embedded/raspi_raw'
+# Already cropped captures checked in with the firmware
+captures_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'captured_photos')
+
+# Synthetic capture at the sensor resolution
+FRAME_SIZE = (2028, 1520)
+# Pixels the box may be off by, the disc is located on a reduced copy of the frame
+TOLERANCE = 12
+
+def disc_frame(size, centre, radius):
+    """An RGB frame of size with a red fundus disc on a noisy black surround."""
+    width, height = size
+    y, x = np.ogrid[:height, :width]
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 12, (height, width, 3), dtype=np.uint8)
+    frame[(x - centre[0]) ** 2 + (y - centre[1]) ** 2 <= radius ** 2] += np.array((170, 70, 35), dtype=np.uint8)
+    return Image.fromarray(frame)
+
+def expected_box(centre, radius):
+    half = radius * (1 + 2 * MARGIN)
+    return (centre[0] - half, centre[1] - half, centre[0] + half, centre[1] + half)
+
+def check(label, box, expected):
+    """Print the outcome, returns an error message on a mismatch."""
+    if expected is None or box is None:
+        ok = box is None and expected is None
+    else:
+        ok = all(abs(found - wanted) <= TOLERANCE for found, wanted in zip(box, expected))
+    print(f"{label}: box {box}, expected {expected if expected is None else tuple(round(v) for v in expected)}"
+          f"{'' if ok else '  <-- mismatch'}")
+    return None if ok else f"{label}: {box}"
+
+def check_boxes():
+    errors = []
+    width, height = FRAME_SIZE
+
+    # Disc inside the frame
+    centre, radius = (width / 2, height / 2), height * 0.4
+    frame = disc_frame(FRAME_SIZE, centre, radius)
+    box = find_fundus_box(frame)
+    errors.append(check("centred disc", box, expected_box(centre, radius)))
+    if box is not None:
+        errors.append(check("centred disc cropped again", find_fundus_box(frame.crop(box)), None))
+
+    # Disc clipped by the top and bottom of the frame, the box extends past them
+    centre, radius = (width / 2, height / 2), height * 0.6
+    errors.append(check("clipped disc", find_fundus_box(disc_frame(FRAME_SIZE, centre, radius)),
+                        expected_box(centre, radius)))
+
+    # Sample captures, already cropped
+    for filename in sorted(f for f in os.listdir(captures_dir) if f.lower().endswith(".jpg")):
+        with Image.open(os.path.join(captures_dir, filename)) as img:
+            errors.append(check(f"sample {filename}", find_fundus_box(img.convert("RGB")), None))
+    return [error for error in errors if error is not None]
+
+def encoded_size(img):
+    buffer = io.BytesIO()
+    img.convert("RGB").save(buffer, "JPEG", quality=95)
+    return buffer.tell()
+
+def benchmark(images_dir_arg):
+    image_filenames = sorted(f for f in os.listdir(images_dir_arg) if f.lower().endswith(".jpg"))
+    if not image_filenames:
+        print(f"No images found in {images_dir_arg}")
+        return
+
+    crop_times = []
+    bytes_before = 0
+    bytes_after = 0
+    for image_filename in image_filenames:
+        with Image.open(os.path.join(images_dir_arg, image_filename)) as img:
+            img.load()  # decode outside the timed section
+
+            start_time = time.perf_counter()
+            cropped = crop_fundus(img)
+            crop_times.append(time.perf_counter() - start_time)
+
+            bytes_before += encoded_size(img)
+            bytes_after += encoded_size(cropped)
+
+    crop_times.sort()
+    print(f"Images: {len(image_filenames)}")
+    print(f"Crop time: mean {1000 * sum(crop_times) / len(crop_times):.1f} ms, "
+          f"max {1000 * crop_times[-1]:.1f} ms")
+    print(f"JPEG bytes: {bytes_before} -> {bytes_after} ({100 * bytes_after / bytes_before:.1f}%)")
+
+def main():
+    errors = check_boxes()
+
+    images_dir_arg = sys.argv[1] if len(sys.argv) > 1 else images_dir
+    if os.path.isdir(images_dir_arg):
+        benchmark(images_dir_arg)
+    else:
+        print(f"Sample set {images_dir_arg} not found, skipping the crop benchmark")
+
+    if errors:
+        sys.exit(f"Unexpected crop boxes: {', '.join(errors)}")
+    print("Crop boxes (ok)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Illumination controller
+
+Drives the fundus illuminator LED through hardware PWM so the light is dimmed
+between captures and only at full brightness while the camera is exposing.
+
+Features:
+- Ramp, hold, pulse-for-exposure and off, with thread-safe duty changes
+- Pulses nest (a burst inside a capture), the light dims when the outermost one ends
+- Settle time after ramping up so auto exposure adapts before the frames are grabbed
+- Duty accounting (average duty, seconds at full brightness) to track LED thermal load over a day
+- HardwarePWM backend (rpi_hardware_pwm) and a fake backend for testing without the Pi
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import get_metrics
+
+# PWM output of the illuminator (GPIO 12)
+PWM_CHANNEL = 0
+PWM_CHIP = 0
+PWM_FREQUENCY = 1000
+
+# Duty cycles (percent): dim light between captures, full brightness during the exposure
+IDLE_DUTY = 10
+EXPOSURE_DUTY = 100
+# Seconds to ramp between levels (a hard step makes patients blink) and in how many steps
+RAMP_TIME = 0.05
+RAMP_STEPS = 10
+# Seconds at full brightness before the frames are grabbed, for auto exposure to settle
+SETTLE_TIME = 0.1
+
+class HardwarePWMBackend:
+    """
+    Illuminator driven by the Pi's hardware PWM (rpi_hardware_pwm).
+
+    Args:
+        channel, chip: PWM output to drive.
+        frequency: PWM frequency in Hz.
+    """
+    def __init__(self, channel=PWM_CHANNEL, chip=PWM_CHIP, frequency=PWM_FREQUENCY):
+        from rpi_hardware_pwm import HardwarePWM
+
+        self.pwm = HardwarePWM(pwm_channel=channel, hz=frequency, chip=chip)
+        self.started = False
+
+    def set_duty(self, duty):
+        if not self.started:
+            self.pwm.start(duty)
+            self.started = True
+        else:
+            self.pwm.change_duty_cycle(duty)
+
+    def stop(self):
+        if self.started:
+            self.pwm.stop()
+            self.started = False
+
+class FakePWMBackend:
+    """
+    Stand-in PWM output for testing, records every duty cycle written.
+
+    Args:
+        fail: If true every write raises OSError.
+    """
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.writes = []  # (time.monotonic(), duty)
+        self.stopped = False
+
+    def set_duty(self, duty):
+        if self.fail:
+            raise OSError("fake PWM failure")
+        self.writes.append((time.monotonic(), duty))
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+class IlluminationController:
+    """
+    Brightness of the illuminator.
+
+    Args:
+        backend: PWM backend (HardwarePWMBackend, FakePWMBackend). Defaults to the hardware PWM.
+        idle_duty: Duty cycle between captures (enough for the patient to fixate, 0 for dark).
+        exposure_duty: Duty cycle during the exposure window.
+        ramp_time, ramp_steps: Duration and resolution of level changes.
+        settle_time: Seconds at exposure_duty before a pulse hands over to the capture.
+    """
+    def __init__(self, backend=None, idle_duty=IDLE_DUTY, exposure_duty=EXPOSURE_DUTY,
+                 ramp_time=RAMP_TIME, ramp_steps=RAMP_STEPS, settle_time=SETTLE_TIME):
+        self.backend = backend if backend is not None else HardwarePWMBackend()
+        self.idle_duty = idle_duty
+        self.exposure_duty = exposure_duty
+        self.ramp_time = ramp_time
+        self.ramp_steps = ramp_steps
+        self.settle_time = settle_time
+        self.duty = 0.0
+        self.pulses = 0
+        self.duty_seconds = 0.0  # integral of duty (0-1) over time
+        self.full_seconds = 0.0  # seconds at exposure_duty
+        self._started = time.monotonic()
+        self._changed = self._started
+        self._depth = 0  # pulses in progress
+        self._lock = threading.RLock()
+
+    def _account(self, now):
+        elapsed = now - self._changed
+        self.duty_seconds += self.duty / 100 * elapsed
+        if self.duty >= self.exposure_duty:
+            self.full_seconds += elapsed
+        self._changed = now
+
+    def set(self, duty):
+        """
+        Change the duty cycle immediately.
+
+        Raises:
+            OSError: If the PWM output can't be written.
+        """
+        duty = max(0.0, min(float(duty), 100.0))
+        with self._lock:
+            if duty == self.duty:
+                return
+            self.backend.set_duty(duty)
+            self._account(time.monotonic())
+            self.duty = duty
+
+    def ramp(self, duty, duration=None):
+        """Change the duty cycle linearly over duration seconds (ramp_time by default), blocking."""
+        duration = self.ramp_time if duration is None else duration
+        with self._lock:
+            start = self.duty
+            steps = self.ramp_steps if duration > 0 else 1
+            for step in range(1, steps + 1):
+                self.set(start + (duty - start) * step / steps)
+                if step < steps:
+                    time.sleep(duration / steps)
+
+    def hold(self, duty=None):
+        """Ramp to duty (idle_duty by default) and keep it until the next change."""
+        self.ramp(self.idle_duty if duty is None else duty)
+
+    @contextmanager
+    def pulse(self, duty=None):
+        """
+        Full brightness for the exposure window, back to idle_duty afterwards:
+
+            with illumination.pulse():
+                frame = camera.capture_array()
+        """
+        with self._lock:
+            self._depth += 1
+            outermost = self._depth == 1
+        start_time = time.perf_counter()
+        try:
+            if outermost:
+                self.ramp(self.exposure_duty if duty is None else duty)
+                time.sleep(self.settle_time)
+                self.pulses += 1
+            yield self
+        finally:
+            with self._lock:
+                self._depth -= 1
+                last = self._depth == 0
+            if last:
+                self.ramp(self.idle_duty)
+                get_metrics().record("illumination.pulse", time.perf_counter() - start_time)
+
+    def off(self):
+        """Turn the light off (between patients or on shutdown)."""
+        self.ramp(0)
+
+    def average_duty(self):
+        """Average duty cycle (percent) since the controller was created."""
+        with self._lock:
+            now = time.monotonic()
+            self._account(now)
+            elapsed = now - self._started
+            return 100 * self.duty_seconds / elapsed if elapsed > 0 else self.duty
+
+    def report(self):
+        print(f"Illumination: {self.pulses} pulses, {self.full_seconds:.1f} s at full brightness, "
+              f"average duty {self.average_duty():.1f}%")
+
+    def close(self):
+        """Turn the light off and release the PWM output."""
+        with self._lock:
+            try:
+                self.set(0)
+            finally:
+                self._account(time.monotonic())
+                self.backend.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def open_illumination(backend=None, **kwargs):
+    """
+    Create the illumination controller and dim the light to its idle level.
+
+    Returns:
+        IlluminationController: The controller, or None if the PWM output is unavailable
+                                (not a Pi, rpi_hardware_pwm missing, PWM overlay not enabled).
+    """
+    try:
+        illumination = IlluminationController(backend, **kwargs)
+        illumination.hold()
+    except Exception as e:  # rpi_hardware_pwm raises its own exception when the PWM overlay is missing
+        print(f"Illumination unavailable, capturing without light control: {e}")
+        return None
+    return illumination
@@ -0,0 +1,138 @@
+"""
+Image metrics
+
+Vectorized NumPy measurements of retinal frames shared by autofocus and capture.
+
+Features:
+- Grayscale, downscaled and ROI views of frames
+- Laplacian variance sharpness metric
+- Burst scoring (sharpness, exposure, eyelid occlusion) of N frames in one pass
+"""
+import numpy as np
+
+from vision.fundus_crop import BACKGROUND_THRESHOLD
+
+def to_gray(frame):
+    """
+    Convert an RGB (H, W, 3) frame to a float32 grayscale array, grayscale frames pass through.
+    """
+    frame = np.asarray(frame)
+    if frame.ndim == 3:
+        # ITU-R 601 luma weights
+        return frame[..., 0] * np.float32(0.299) + frame[..., 1] * np.float32(0.587) + frame[..., 2] * np.float32(0.114)
+    return frame.astype(np.float32, copy=False)
+
+def downscale(gray, max_size=320):
+    """
+    Downscale a grayscale array by an integer factor (block average) so its longest side is at most max_size.
+    """
+    factor = max(1, -(-max(gray.shape[:2]) // max_size))
+    if factor == 1:
+        return gray
+    h = gray.shape[0] // factor * factor
+    w = gray.shape[1] // factor * factor
+    return gray[:h, :w].reshape(h // factor, factor, w // factor, factor).mean(axis=(1, 3))
+
+def center_roi(gray, fraction=0.5):
+    """
+    Return the centered region covering fraction of the width and height.
+    """
+    h, w = gray.shape[:2]
+    roi_h, roi_w = max(1, int(h * fraction)), max(1, int(w * fraction))
+    top, left = (h - roi_h) // 2, (w - roi_w) // 2
+    return gray[top:top + roi_h, left:left + roi_w]
+
+def laplacian_variance(gray):
+    """
+    Sharpness of a grayscale array as the variance of its 4-neighbour Laplacian,
+    higher is sharper.
+    """
+    gray = np.asarray(gray, dtype=np.float32)
+    laplacian = (
+        gray[:-2, 1:-1] + gray[2:, 1:-1] + gray[1:-1, :-2] + gray[1:-1, 2:]
+        - 4 * gray[1:-1, 1:-1]
+    )
+    return float(laplacian.var())
+
+def burst_stack(frames, factor=4, channel=1):
+    """
+    Stack the green channels (or another channel) of a burst, block-averaged by factor, into one (N, h, w) float32 array.
+
+    The green channel carries most of the vessel contrast in fundus images and skips
+    the grayscale conversion. Blocks are summed with strided uint16 adds, which is
+    several times faster than a reshape/sum over the interleaved RGB buffer.
+    """
+    frames = [np.asarray(frame) for frame in frames]
+    h = frames[0].shape[0] // factor * factor
+    w = frames[0].shape[1] // factor * factor
+    stack = np.empty((len(frames), h // factor, w // factor), dtype=np.float32)
+    for i, frame in enumerate(frames):
+        green = (frame[:h, :w, channel] if frame.ndim == 3 else frame[:h, :w]).astype(np.uint16)
+        rows = sum(green[offset::factor] for offset in range(factor))
+        stack[i] = sum(rows[:, offset::factor] for offset in range(factor))
+    stack /= factor * factor
+    return stack
+
+class BurstScores:
+    """
+    Per-frame scores of a burst.
+
+    Attributes:
+        sharpness: Laplacian variance of each frame's center ROI.
+        exposure: 1.0 for a well exposed fundus, falling towards 0 with clipping or a mean far from mid-grey.
+        occlusion: How far each frame's horizontal bands deviate from the burst median (blinks, eyelids).
+        score: Combined score, the best frame has the highest.
+        best: Index of the best frame.
+    """
+    def __init__(self, sharpness, exposure, occlusion):
+        self.sharpness = sharpness
+        self.exposure = exposure
+        self.occlusion = occlusion
+        self.score = (sharpness / max(float(sharpness.max()), 1e-6)) * exposure * (1 - np.clip(occlusion, 0, 1))
+        self.best = int(np.argmax(self.score))
+
+    def __repr__(self):
+        return (f"BurstScores(best={self.best}, score={np.round(self.score, 3).tolist()}, "
+                f"occlusion={np.round(self.occlusion, 3).tolist()})")
+
+def score_burst(frames, factor=4, roi=0.5, bands=3):
+    """
+    Score every frame of a burst for sharpness, exposure and eyelid occlusion in one vectorized pass.
+
+    Args:
+        frames: Sequence of RGB (H, W, 3) or grayscale frames of the same size.
+        factor: Block size the frames are reduced by before scoring.
+        roi: Center fraction used for the sharpness measure.
+        bands: Number of horizontal bands compared for the occlusion heuristic.
+
+    Returns:
+        BurstScores: The per-frame scores and the index of the best frame.
+    """
+    stack = burst_stack(frames, factor)
+    n, h, w = stack.shape
+
+    # Sharpness: Laplacian variance of the center ROI of every frame at once
+    roi_h, roi_w = max(3, int(h * roi)), max(3, int(w * roi))
+    top, left = (h - roi_h) // 2, (w - roi_w) // 2
+    center = stack[:, top:top + roi_h, left:left + roi_w]
+    laplacian = (
+        center[:, :-2, 1:-1] + center[:, 2:, 1:-1] + center[:, 1:-1, :-2] + center[:, 1:-1, 2:]
+        - 4 * center[:, 1:-1, 1:-1]
+    )
+    sharpness = laplacian.reshape(n, -1).var(axis=1)
+
+    # Exposure: penalise clipped highlights/shadows and a mean far from mid-grey, measured on the fundus only
+    # (the black surround would otherwise dominate the shadow count), located on the middle frame's red channel
+    fundus = burst_stack([frames[n // 2]], factor, channel=0)[0] > BACKGROUND_THRESHOLD
+    flat = stack[:, fundus] if fundus.any() else stack.reshape(n, -1)
+    clipped = ((flat >= 250) | (flat <= 5)).mean(axis=1)
+    mean_offset = np.abs(flat.mean(axis=1) - 128) / 128
+    exposure = np.clip(1 - 2 * clipped, 0, 1) * (1 - 0.5 * mean_offset)
+
+    # Occlusion: an eyelid or blink changes the brightness of whole horizontal bands,
+    # compare each band with the burst's median band
+    band_means = stack[:, :h // bands * bands].reshape(n, bands, -1).mean(axis=2)
+    median = np.median(band_means, axis=0)
+    occlusion = (np.abs(band_means - median) / (median + 10)).max(axis=1)
+
+    return BurstScores(sharpness, exposure, occlusion)
@@ -0,0 +1,111 @@
+"""
+Live preview stream
+
+Grabs low resolution frames from the camera session on a background thread so
+the touchscreen can show a live preview while the still pipeline stays warm.
+
+Features:
+- Frames come from the same CameraSession as still captures (stills take priority)
+- Latest-wins frame slot, frames the UI didn't pick up in time are dropped
+- Frame rate limit and grabbed/shown/dropped counters
+"""
+import threading
+import time
+
+# Target preview frame rate
+PREVIEW_FPS = 24
+
+class PreviewStream:
+    """
+    Background grabber of preview frames from a camera session.
+
+    Args:
+        session: Opened CameraSession, shared with the still capture path.
+        fps: Maximum frames grabbed per second.
+    """
+    def __init__(self, session, fps=PREVIEW_FPS):
+        self.session = session
+        self.fps = fps
+        self.grabbed = 0
+        self.shown = 0
+        self.dropped = 0
+        self._latest = None  # newest frame not yet taken by the UI
+        self._slot_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_at = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def start(self):
+        """Start grabbing frames, does nothing if the stream is already running."""
+        if self.running:
+            return self
+        if self._thread is not None:
+            self._thread.join()  # a stopped grabber still finishing its last frame
+        self._stop.clear()
+        self.grabbed = self.shown = self.dropped = 0
+        self._latest = None
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="preview", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        interval = 1 / self.fps
+        next_frame = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                frame = self.session.capture_preview()
+            except Exception as e:
+                print(f"Preview stream stopped: {e}")
+                break
+
+            with self._slot_lock:
+                if self._latest is not None:
+                    self.dropped += 1  # the UI fell behind, only the newest frame is kept
+                self._latest = frame
+                self.grabbed += 1
+
+            next_frame = max(next_frame + interval, time.monotonic())
+            self._stop.wait(next_frame - time.monotonic())
+        self.report()
+
+    def latest(self):
+        """
+        Take the newest frame, or None if there is no new frame since the last call.
+        """
+        with self._slot_lock:
+            frame, self._latest = self._latest, None
+        if frame is not None:
+            self.shown += 1
+        return frame
+
+    def stop(self, wait=False):
+        """
+        Stop grabbing frames. The grabber finishes its current frame in the background
+        unless wait is set, a still capture simply queues behind it on the session lock.
+        """
+        self._stop.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def report(self):
+        """
+        Print and return the preview counters.
+
+        Returns:
+            dict: grabbed, shown and dropped frames and the shown frame rate.
+        """
+        elapsed = max(time.monotonic() - self._started_at, 1e-6)
+        report = {
+            "grabbed": self.grabbed,
+            "shown": self.shown,
+            "dropped": self.dropped,
+            "fps": self.shown / elapsed,
+        }
+        print(f"Preview: {report['shown']} frames shown ({report['fps']:.1f} fps), "
+              f"{report['grabbed']} grabbed, {report['dropped']} dropped")
+        return report
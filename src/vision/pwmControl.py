@@ -1,18 +1,27 @@
+import os
+import sys
 import time
 import argparse
-from rpi_hardware_pwm import HardwarePWM
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # allow vision imports
+
+from vision.illumination import IlluminationController, HardwarePWMBackend, FakePWMBackend
 
 """
 PWM Test Code
 
 Features:
 - Customizable PWM on Pin 12 that runs until keyboard interrupt (CTRL C)
+- Drives the illuminator through the same IlluminationController as the capture session
+- Optional --pulse mode that repeats the capture exposure pulse (ramp up, settle, ramp down)
+- --fake runs against the fake PWM backend without the Pi
 - Stops PWM upon clean exit
 """
 def pwmLoop():
     # Set up argument parser
     parser = argparse.ArgumentParser(description='PWM Control with User-Specified Duty Cycle')
     parser.add_argument('--duty', type=float, required=True, help='Duty cycle percentage (0-100)')
+    parser.add_argument('--pulse', type=float, default=None, help='Pulse to full brightness every PULSE seconds, --duty is the idle level')
+    parser.add_argument('--fake', action='store_true', help='Use the fake PWM backend instead of the hardware PWM')
     args = parser.parse_args()
 
     # Check if duty arg is within valid range
@@ -20,19 +29,26 @@ def pwmLoop():
         raise ValueError("Duty cycle must be between 0 and 100")
 
     # Initialize PWM
-    pwm = HardwarePWM(pwm_channel=0, hz=1000, chip=0)
-    pwm.start(args.duty)
-    
+    backend = FakePWMBackend() if args.fake else HardwarePWMBackend()
+    illumination = IlluminationController(backend, idle_duty=args.duty)
+    illumination.hold(args.duty)
+
     # CTRL C to cleanly exit and pwm
     try:
         print(f"Running PWM at {args.duty}% duty cycle. Press CTRL+C to exit.")
         while True:
-            time.sleep(1)
+            if args.pulse is not None:
+                time.sleep(args.pulse)
+                with illumination.pulse():
+                    pass  # the exposure window of a capture
+                illumination.report()
+            else:
+                time.sleep(1)
     except KeyboardInterrupt:
-        pwm.stop()
+        illumination.close()
 
 def main():
     pwmLoop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
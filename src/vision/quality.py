@@ -0,0 +1,142 @@
+"""
+Capture quality gate
+
+Scores a captured fundus frame on the device right after capture, so blurry, dark
+or glared images are retaken immediately instead of coming back as "Inconclusive"
+after a full upload and inference round-trip.
+
+Features:
+- Vectorized metrics on a strided view of the frame (no full resolution copies)
+- Sharpness: Laplacian variance of the block-averaged green channel at the disc centre
+- Exposure: green brightness and red clipping inside the fundus disc
+- Fundus coverage: share of the (cropped) frame brighter than the dark surround
+- Glare: share of the disc that is near-white specular reflection
+- Thresholds per metric, the report lists which checks failed
+"""
+import numpy as np
+
+from vision.fundus_crop import BACKGROUND_THRESHOLD
+from vision.image_metrics import burst_stack, center_roi, laplacian_variance
+
+# Longest side of the strided view the exposure, coverage and glare metrics are computed on
+ANALYSIS_SIZE = 256
+# Block size the green channel is averaged by before the sharpness measure (same as burst scoring)
+SHARPNESS_FACTOR = 4
+
+# Default thresholds, starting points to be tuned on captures from the kiosk
+MIN_SHARPNESS = 4.0  # Laplacian variance of the green channel
+MIN_BRIGHTNESS = 20  # mean green level inside the disc
+MAX_BRIGHTNESS = 200
+MAX_CLIPPED = 0.05  # share of disc pixels with a saturated red channel
+MIN_COVERAGE = 0.4  # share of the frame covered by the disc, a whole disc in its bounding square is ~0.78
+MAX_GLARE = 0.02  # share of disc pixels that are near-white in every channel
+GLARE_LEVEL = 235
+
+class CaptureQualityError(Exception):
+    """A capture that still failed the quality gate after every attempt."""
+    def __init__(self, report):
+        super().__init__(f"Image quality too low ({', '.join(report.failures)}), please retake")
+        self.report = report
+
+class QualityReport:
+    """
+    Quality metrics of one frame.
+
+    Attributes:
+        sharpness, brightness, clipped, coverage, glare: The measured metrics.
+        failures: Names of the failed checks, empty if the frame passed.
+        passed: True if every check passed.
+    """
+    def __init__(self, sharpness, brightness, clipped, coverage, glare, failures):
+        self.sharpness = sharpness
+        self.brightness = brightness
+        self.clipped = clipped
+        self.coverage = coverage
+        self.glare = glare
+        self.failures = failures
+        self.passed = not failures
+
+    @property
+    def score(self):
+        """Sort key of attempts: fewest failed checks first, then sharpest."""
+        return (-len(self.failures), self.sharpness)
+
+    def as_dict(self):
+        return {
+            "sharpness": round(self.sharpness, 2),
+            "brightness": round(self.brightness, 1),
+            "clipped": round(self.clipped, 4),
+            "coverage": round(self.coverage, 3),
+            "glare": round(self.glare, 4),
+            "failures": list(self.failures),
+        }
+
+    def __repr__(self):
+        return f"QualityReport({self.as_dict()})"
+
+class QualityGate:
+    """
+    Accepts or rejects captured frames.
+
+    Args:
+        min_sharpness: Minimum Laplacian variance of the green channel at the centre.
+        min_brightness, max_brightness: Range of the mean green level inside the disc.
+        max_clipped: Maximum share of disc pixels with a saturated red channel.
+        min_coverage: Minimum share of the frame covered by the disc.
+        max_glare: Maximum share of near-white disc pixels.
+    """
+    def __init__(self, min_sharpness=MIN_SHARPNESS, min_brightness=MIN_BRIGHTNESS, max_brightness=MAX_BRIGHTNESS,
+                 max_clipped=MAX_CLIPPED, min_coverage=MIN_COVERAGE, max_glare=MAX_GLARE):
+        self.min_sharpness = min_sharpness
+        self.min_brightness = min_brightness
+        self.max_brightness = max_brightness
+        self.max_clipped = max_clipped
+        self.min_coverage = min_coverage
+        self.max_glare = max_glare
+
+    def assess(self, frame):
+        """
+        Measure a frame and check it against the thresholds.
+
+        Args:
+            frame: RGB (H, W, 3) uint8 array, normally already cropped to the fundus.
+
+        Returns:
+            QualityReport: The metrics and the failed checks.
+        """
+        frame = np.asarray(frame)
+        if frame.ndim == 2:
+            frame = frame[..., None].repeat(3, axis=2)
+
+        # Strided view for the per-pixel metrics, the disc is large so every Nth pixel is plenty
+        step = max(1, max(frame.shape[:2]) // ANALYSIS_SIZE)
+        small = frame[::step, ::step]
+        red, green = small[..., 0], small[..., 1]
+
+        # Everything brighter than the dark surround is fundus, the same threshold the fundus crop uses
+        mask = red > BACKGROUND_THRESHOLD
+        disc_pixels = int(mask.sum())
+        coverage = disc_pixels / mask.size
+        if disc_pixels:
+            brightness = float(green[mask].mean())
+            clipped = float((red[mask] >= 250).mean())
+            glare = float((small.min(axis=2)[mask] >= GLARE_LEVEL).mean())
+        else:
+            brightness, clipped, glare = 0.0, 0.0, 0.0
+
+        # Sharpness at the disc centre, away from the disc edge which is sharp in any frame
+        green_blocks = burst_stack([frame], SHARPNESS_FACTOR)[0]
+        sharpness = laplacian_variance(center_roi(green_blocks, 0.5))
+
+        failures = []
+        if coverage < self.min_coverage:
+            failures.append("fundus not in view")
+        if sharpness < self.min_sharpness:
+            failures.append("blurry")
+        if brightness < self.min_brightness:
+            failures.append("too dark")
+        elif brightness > self.max_brightness or clipped > self.max_clipped:
+            failures.append("overexposed")
+        if glare > self.max_glare:
+            failures.append("glare")
+        return QualityReport(sharpness, brightness, clipped, coverage, glare, failures)
@@ -0,0 +1,66 @@
+"""
+Quality Gate Check
+
+Run from src/: python -m vision.quality_test [images_dir]
+
+Features:
+- Runs the capture quality gate on every image of a directory (the repo's sample captures by default)
+- Each sample must pass, and degraded copies of it must fail the matching check:
+  blurred -> "blurry", darkened -> "too dark", a glare patch -> "glare", a black frame -> "fundus not in view"
+- Prints each image's metrics and exits non-zero on any unexpected outcome, so threshold changes
+  can be checked against known good captures
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageFilter
+from vision.quality import QualityGate
+
+# Known good captures checked in with the firmware
+images_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'captured_photos')
+
+def variants(img):
+    """(label, RGB array, expected failure or None) for a good capture and degraded copies of it."""
+    array = np.asarray(img)
+    glare = array.copy()
+    height, width = glare.shape[:2]
+    glare[height // 5:height // 2, width // 5:width // 2] = 255  # specular reflection on the cornea
+    return [
+        ("as captured", array, None),
+        ("blurred", np.asarray(img.filter(ImageFilter.GaussianBlur(8))), "blurry"),
+        ("darkened", (array * 0.25).astype(np.uint8), "too dark"),
+        ("glare", glare, "glare"),
+        ("black", np.zeros_like(array), "fundus not in view"),
+    ]
+
+def main():
+    images_dir_arg = sys.argv[1] if len(sys.argv) > 1 else images_dir
+    image_filenames = sorted(f for f in os.listdir(images_dir_arg) if f.lower().endswith(".jpg"))
+    if not image_filenames:
+        sys.exit(f"No images found in {images_dir_arg}")
+
+    gate = QualityGate()
+    mismatches = []
+    for image_filename in image_filenames:
+        with Image.open(os.path.join(images_dir_arg, image_filename)) as img:
+            img = img.convert("RGB")
+
+        for label, array, expected in variants(img):
+            start_time = time.perf_counter()
+            report = gate.assess(array)
+            elapsed = time.perf_counter() - start_time
+
+            ok = report.passed if expected is None else expected in report.failures
+            print(f"{image_filename} {label}: {'passed' if report.passed else 'rejected'} in {1000 * elapsed:.1f} ms "
+                  f"{report.as_dict()}{'' if ok else '  <-- unexpected'}")
+            if not ok:
+                mismatches.append(f"{image_filename} {label} (expected {expected or 'pass'})")
+
+    if mismatches:
+        sys.exit(f"Unexpected quality gate outcomes: {', '.join(mismatches)}")
+    print(f"All {len(image_filenames)} images and their degraded copies checked (ok)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Scan sessions
+
+Every patient's scan is a session with its own ID and scratch directory, so a new
+patient can start capturing while the previous patient's upload is still running,
+and uploads send exactly the session's images instead of whatever is in the
+capture directory.
+
+Features:
+- Unique session IDs (timestamp + random suffix) with a directory per session
+- In-memory frames plus an on-disk manifest of the archived images
+- Atomic write-then-rename of images and manifest
+- Loading the latest session back from disk, pruning of old session directories
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+
+from vision.frame_buffer import FrameStore
+
+# Name of the manifest file in each session directory
+MANIFEST = "manifest.json"
+# Session directories kept on the SD card, the oldest are deleted when a session starts
+SESSIONS_KEPT = 50
+
+class ScanSession(FrameStore):
+    """
+    The captures of one patient.
+
+    Args:
+        root_dir: Directory the session directories are created in.
+        session_id: ID of the session, generated if not given.
+    """
+    def __init__(self, root_dir, session_id=None):
+        super().__init__()
+        self.root_dir = root_dir
+        self.session_id = session_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.directory = os.path.join(root_dir, self.session_id)
+        self.created = time.time()
+        self.images = {}  # name -> {"name", "side", "bytes"} of the archived images
+
+    def add(self, frame, side=None):
+        """
+        Keep a captured frame in the session and archive it to the session directory.
+        A frame with the same name (a retake of the same eye) replaces the previous one.
+
+        Returns:
+            Frame: The stored frame.
+        """
+        self.put(frame)
+        frame.write(self.directory)
+        self.images[frame.name] = {
+            "name": frame.name,
+            "side": side,
+            "bytes": os.path.getsize(frame.path),
+        }
+        if frame.quality is not None:
+            self.images[frame.name]["quality"] = frame.quality.as_dict()
+        self.write_manifest()
+        return frame
+
+    def manifest(self):
+        return {
+            "session_id": self.session_id,
+            "created": self.created,
+            "images": [self.images[name] for name in sorted(self.images)],
+        }
+
+    def write_manifest(self):
+        """Write the manifest through a temporary file and an atomic rename."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, MANIFEST)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def upload_items(self):
+        """
+        What to upload for this session: the in-memory frames, or for a session loaded
+        from disk the image paths listed in its manifest.
+        """
+        frames = self.frames()
+        if frames:
+            return frames
+        return [os.path.join(self.directory, name) for name in sorted(self.images)]
+
+    def image_path(self, name):
+        return os.path.join(self.directory, name)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Load a session back from its directory (images are not read until uploaded).
+
+        Raises:
+            FileNotFoundError: If the directory has no manifest.
+        """
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+        session = cls(os.path.dirname(os.path.abspath(directory)), manifest["session_id"])
+        session.created = manifest["created"]
+        session.images = {image["name"]: image for image in manifest["images"]}
+        return session
+
+    @classmethod
+    def latest(cls, root_dir):
+        """Return the most recent session under root_dir, or None."""
+        directories = session_directories(root_dir)
+        return cls.load(directories[-1]) if directories else None
+
+def session_directories(root_dir):
+    """Session directories under root_dir (those with a manifest), oldest first."""
+    try:
+        names = os.listdir(root_dir)
+    except FileNotFoundError:
+        return []
+    directories = [os.path.join(root_dir, name) for name in names
+                   if os.path.isfile(os.path.join(root_dir, name, MANIFEST))]
+    return sorted(directories, key=lambda directory: os.path.getmtime(os.path.join(directory, MANIFEST)))
+
+def prune_sessions(root_dir, keep=SESSIONS_KEPT, protected=()):
+    """
+    Delete all but the keep most recent session directories.
+
+    Args:
+        protected: IDs of sessions that must be kept regardless (e.g. still waiting to be uploaded).
+    """
+    directories = session_directories(root_dir)
+    for directory in directories[:max(len(directories) - keep, 0)]:
+        if os.path.basename(directory) not in protected:
+            shutil.rmtree(directory, ignore_errors=True)